@@ -19,13 +19,19 @@ from item import Item, SimpleItem, HandItem, BlockItem, MATERIAL_TOOL_TYPES, TOO
 from player import Player
 from dropped_item import DroppedItem
 from crafting import GridCrafter, CraftingWindow
+from recipe_book import RecipeBook, CraftableTracker, get_requirements
+from crafting_planner import CraftingPlanner, MissingMaterialsError
 from world import World
 from core import positions_in_range
 from game import GameView, WorldViewRouter
-from mob import Bird, Mob
+from controls import InputState
+from mob import Bird, Mob, MOB_DEFAULT_TEMPO
+from mob_steering import random_walk
+from mob_spawner import MobSpawner
+from physics_metrics import PhysicsMetricsWriter
 from physical_thing import BoundaryWall
 
-import cmath
+import copy
 
 from tkinter import messagebox
 
@@ -33,6 +39,26 @@ BLOCK_SIZE = 2 ** 5
 GRID_WIDTH = 2 ** 5
 GRID_HEIGHT = 2 ** 4
 
+# Keys held to move the player, mapped to the (x, y) direction of movement
+MOVEMENT_KEYS = {
+    "a": (-1, 0),
+    "Left": (-1, 0),
+    "d": (1, 0),
+    "Right": (1, 0),
+    "s": (0, 1),
+    "Down": (0, 1),
+}
+JUMP_KEYS = ("space",)
+# Keys that activate each cell of the hotbar, from left to right
+HOTBAR_KEYS = "1234567890"
+
+# Velocity added each step while a movement key is held, and the speed it can't push the player beyond
+PLAYER_MOVE_IMPULSE = 80
+PLAYER_MAX_SPEED = 160
+
+# The file to which physics statistics are periodically appended (see PhysicsMetricsWriter), or None to not export them
+PHYSICS_METRICS_FILE = None
+
 # Task 3/Post-grad only:
 # Class to hold game data that is passed to each thing's step function
 # Normally, this class would be defined in a separate file
@@ -41,29 +67,136 @@ GRID_HEIGHT = 2 ** 4
 # for these tasks, we have defined it here
 GameData = namedtuple('GameData', ['world', 'player'])
 
+# Items gathered from the world, which the crafting planner should never try to craft
+RAW_MATERIALS = {'dirt', 'wood', 'stone', 'apple', 'wool', 'honey'}
+# The types of crafting whose recipes the crafting planner can use, while crafting with each type;
+# basic crafting is always at hand, so can be used alongside a crafting table
+AUTO_CRAFT_TYPES = {
+    'basic': ('basic',),
+    'crafting_table': ('basic', 'crafting_table'),
+}
+
 SHEEP_GRAVITY_FACTOR = 100
+SHEEP_THINK_INTERVAL = 2
+
+# Sheep flee along the ground from a player within the flee radius, to a cell the flee distance
+# (in cells) away from the player, thinking more often while they flee
+SHEEP_FLEE_RADIUS = 150
+SHEEP_FLEE_DISTANCE = 8
+SHEEP_FLEE_THINK_INTERVAL = .2
+SHEEP_FLEE_SPEED = 120
+SHEEP_JUMP_SPEED = 200
 
 
 class Sheep(Mob):
-    """A friendly sheep,  move around randomly and do not damage the player"""
+    """A friendly sheep,  move around randomly and do not damage the player
+
+    Skittish, fleeing from a player that comes too close"""
+
+    def __init__(self, mob_id, size, tempo=MOB_DEFAULT_TEMPO, max_health=20, think_interval=SHEEP_THINK_INTERVAL):
+        """Constructor
+
+        See Mob.__init__ for parameters"""
+        super().__init__(mob_id, size, tempo=tempo, max_health=max_health, think_interval=think_interval)
+
+        self._fleeing = False
+        # The cells left to move through while fleeing, or None if there is no path
+        self._path = None
+
+    def get_random_walk(self):
+        """Wanders in a random direction
+
+        See Mob.get_random_walk for return"""
+        return 2, SHEEP_GRAVITY_FACTOR
+
+    def get_think_interval(self):
+        """(float) Returns the time (in seconds) between each time this sheep thinks, which is shorter
+        while fleeing"""
+        return SHEEP_FLEE_THINK_INTERVAL if self._fleeing else super().get_think_interval()
+
+    def think(self, time_delta, game_data):
+        """Flees from the player along a path, if they are close, otherwise wanders
+
+        See Mob.think for parameters"""
+        self.think_all([self], [time_delta], game_data)
 
-    def step(self, time_delta, game_data):
-        """Advance this sheep by one time step
+    @classmethod
+    def think_all(cls, mobs, time_deltas, game_data):
+        """Flees each sheep close to the player in turn, then wanders the rest in one batch
 
-        See PhysicalThing.step for parameters & return"""
+        See Mob.think_all for parameters"""
+        wanderers = []
+        wanderer_time_deltas = []
+
+        for sheep, time_delta in zip(mobs, time_deltas):
+            if not sheep._flee(game_data):
+                wanderers.append(sheep)
+                wanderer_time_deltas.append(time_delta)
+
+        cls.wander_all(wanderers, wanderer_time_deltas)
+
+    def _flee(self, game_data):
+        """Flees from the player along a path, if they are close
+
+        Parameters:
+            game_data (GameData): The data supplied to Mob.think
+
+        Return:
+            bool: True iff this sheep is fleeing
+        """
+        if game_data is None or game_data.player is None:
+            return False
+
+        world = game_data.world
+        x, y = self.get_position()
+        player_x, player_y = game_data.player.get_position()
+
+        if (x - player_x) ** 2 + (y - player_y) ** 2 > SHEEP_FLEE_RADIUS ** 2:
+            self._fleeing = False
+            self._path = None
+            return False
+
+        self._fleeing = True
+        direction = 1 if x >= player_x else -1
+
+        pathfinder = world.get_pathfinder()
+        column, row = world.xy_to_grid(x, y)
+        columns, _ = world.get_grid_size()
+
+        start = pathfinder.get_standable(column, row)
+        goal = pathfinder.get_standable(max(0, min(column + direction * SHEEP_FLEE_DISTANCE, columns - 1)), row)
+
+        if start is not None and goal is not None and start != goal:
+            pathfinder.request(self, start, goal, self._set_path)
+
+        self._follow_path(world, column, row, direction)
+        return True
 
-        if self._steps % 100 == 0:
-            health_percentage = self._health / self._max_health
-            z = cmath.rect(self._tempo * health_percentage, random.uniform(0, 2 * cmath.pi))
+    def _set_path(self, path):
+        """Starts following 'path' (see PathFinder.find_path)"""
+        self._path = list(path) if path else None
 
-            dx, dy = z.real * 2, z.imag
+    def _follow_path(self, world, column, row, direction):
+        """Moves towards the next cell of the path, or in 'direction' if there is no path"""
+        path = self._path
 
-            x, y = self.get_velocity()
-            velocity = x + dx, y + dy - SHEEP_GRAVITY_FACTOR
+        # skip cells that have been reached
+        while path and path[0][0] == column:
+            path.pop(0)
 
-            self.set_velocity(velocity)
+        velocity_x, velocity_y = self.get_velocity()
 
-        super().step(time_delta, game_data)
+        if path:
+            next_column, next_row = path[0]
+            velocity_x = SHEEP_FLEE_SPEED if next_column > column else -SHEEP_FLEE_SPEED
+
+            # jump up onto the next cell, if standing
+            if next_row < row and abs(velocity_y) < 1:
+                velocity_y = -SHEEP_JUMP_SPEED
+        else:
+            velocity_x = direction * SHEEP_FLEE_SPEED
+
+        self.set_velocity((velocity_x, velocity_y))
 
     def can_use(self):
         return False
@@ -80,27 +213,117 @@ class Sheep(Mob):
 
 
 BEE_GRAVITY_FACTOR = 200
+BEE_X_SCALE = 1.5
+BEE_THINK_INTERVAL = .1
+
+# Bees swarm with the other bees within the neighbour radius, & towards the player within the swarm radius
+BEE_NEIGHBOUR_RADIUS = 48
+BEE_SWARM_RADIUS = 240
+# Bees closer than the separation distance push apart
+BEE_SEPARATION_DISTANCE = 12
+# The strength of each swarming behaviour; separation & attraction are speeds (pixels per second),
+# while alignment & cohesion are the fraction of the difference in velocity/position closed per second
+BEE_SEPARATION = 120
+BEE_ALIGNMENT = 2
+BEE_COHESION = 1
+BEE_ATTRACTION = 150
+BEE_MAX_SPEED = 180
 
 
 class Bee(Mob):
     """ A bee swarms the player."""
-    def step(self, time_delta, game_data):
-        """Advance this bee by one time step
 
-        See PhysicalThing.step for parameters & return"""
+    def __init__(self, mob_id, size, tempo=MOB_DEFAULT_TEMPO, max_health=20, think_interval=BEE_THINK_INTERVAL):
+        """Constructor
+
+        See Mob.__init__ for parameters"""
+        super().__init__(mob_id, size, tempo=tempo, max_health=max_health, think_interval=think_interval)
+
+    def get_random_walk(self):
+        """Buzzes in a random direction
+
+        See Mob.get_random_walk for return"""
+        return BEE_X_SCALE, BEE_GRAVITY_FACTOR
+
+    def think(self, time_delta, game_data):
+        """Swarms with nearby bees, towards the player if they are close, hovering against gravity
+
+        See Mob.think for parameters"""
+        self.think_all([self], [time_delta], game_data)
+
+    @classmethod
+    def think_all(cls, mobs, time_deltas, game_data):
+        """Swarms each bee in turn, then buzzes them all randomly in one batch
+
+        See Mob.think_all for parameters"""
+        if game_data is None:
+            cls.wander_all(mobs, time_deltas)
+            return
+
+        for bee, time_delta in zip(mobs, time_deltas):
+            bee._swarm(time_delta, game_data)
+
+        # & a dash of randomness
+        random_walk(mobs, BEE_X_SCALE, 0)
+
+    def _swarm(self, time_delta, game_data):
+        """Steers like a boid: apart from bees that are too close (separation), with the velocity
+        of nearby bees (alignment), towards their centre (cohesion), & towards the player (attraction)
+
+        See Mob.think for parameters"""
+        world = game_data.world
+        x, y = self.get_position()
+        velocity_x, velocity_y = self.get_velocity()
+
+        dx = dy = 0
 
-        if self._steps % 20 == 0:
-            health_percentage = self._health / self._max_health
-            z = cmath.rect(self._tempo * health_percentage, random.uniform(0, 2 * cmath.pi))
+        neighbours = [bee for bee in world.get_neighbours(x, y, BEE_NEIGHBOUR_RADIUS, Bee) if bee is not self]
 
-            dx, dy = z.real * 1.5, z.imag
+        if neighbours:
+            centre_x = centre_y = mean_x = mean_y = 0
 
-            x, y = self.get_velocity()
-            velocity = x + dx, y + dy - BEE_GRAVITY_FACTOR
+            for bee in neighbours:
+                bee_x, bee_y = bee.get_position()
+                bee_velocity_x, bee_velocity_y = bee.get_velocity()
 
-            self.set_velocity(velocity)
+                centre_x += bee_x
+                centre_y += bee_y
+                mean_x += bee_velocity_x
+                mean_y += bee_velocity_y
 
-        super().step(time_delta, game_data)
+                distance = ((x - bee_x) ** 2 + (y - bee_y) ** 2) ** .5
+                if 0 < distance < BEE_SEPARATION_DISTANCE:
+                    push = BEE_SEPARATION * (1 - distance / BEE_SEPARATION_DISTANCE) / distance
+                    dx += (x - bee_x) * push
+                    dy += (y - bee_y) * push
+
+            count = len(neighbours)
+            alignment = min(1, BEE_ALIGNMENT * time_delta)
+            cohesion = min(1, BEE_COHESION * time_delta)
+
+            dx += (mean_x / count - velocity_x) * alignment + (centre_x / count - x) * cohesion
+            dy += (mean_y / count - velocity_y) * alignment + (centre_y / count - y) * cohesion
+
+        player = game_data.player
+        if player is not None:
+            player_x, player_y = player.get_position()
+            distance = ((player_x - x) ** 2 + (player_y - y) ** 2) ** .5
+
+            if 0 < distance < BEE_SWARM_RADIUS:
+                dx += (player_x - x) / distance * BEE_ATTRACTION * time_delta
+                dy += (player_y - y) / distance * BEE_ATTRACTION * time_delta
+
+        # counter the gravity since the last think, so the bee hovers
+        gravity_x, gravity_y = world.get_gravity()
+        velocity_x += dx - gravity_x * time_delta
+        velocity_y += dy - gravity_y * time_delta
+
+        speed = (velocity_x ** 2 + velocity_y ** 2) ** .5
+        if speed > BEE_MAX_SPEED:
+            velocity_x *= BEE_MAX_SPEED / speed
+            velocity_y *= BEE_MAX_SPEED / speed
+
+        self.set_velocity((velocity_x, velocity_y))
 
     def use(self):
         pass
@@ -307,16 +530,26 @@ class StatusView(tk.Frame):
         self._food_label = tk.Label(self, text="Food: {}".format(food))
         self._food_label.pack(side=tk.LEFT)
 
+        # The values currently displayed, so that unchanged values aren't rewritten
+        self._health = self._food = None
+
     def set_health(self, health):
         """ A label to display the amount of health the player has remaining,
         with an image of a heart to the left."""
+        health = round(health * 2) / 2
 
-        self._health_label.config(text="Health: {}".format(round(health * 2) / 2))
+        if health != self._health:
+            self._health = health
+            self._health_label.config(text="Health: {}".format(health))
 
     def set_food(self, food):
         """ A label to display the amount of food the player has remaining,
         with an image of a mushroom to the left. """
-        self._food_label.config(text="Food: {}".format(round(food * 2) / 2))
+        food = round(food * 2) / 2
+
+        if food != self._food:
+            self._food = food
+            self._food_label.config(text="Food: {}".format(food))
 
 
 class FoodItem(Item):
@@ -364,7 +597,8 @@ class ToolItem(Item):
         :param tool_type: str
         :param durability: float
         """
-        super().__init__(id_=item_id)
+        # tools each carry their own durability, so can't be stacked
+        super().__init__(id_=item_id, max_stack=1)
         self._tool_type = tool_type
         self._durability = durability
         self._max_durability = durability
@@ -457,7 +691,8 @@ class BowArrowItem(Item):
         :param durability: float
         """
 
-        super().__init__(id_=item_id)
+        # tools each carry their own durability, so can't be stacked
+        super().__init__(id_=item_id, max_stack=1)
         self._tool_type = tool_type
         self._durability = durability
         self._max_durability = durability
@@ -772,6 +1007,17 @@ def load_simple_world(world):
     world.add_mob(Bee("bee", (5, 5)), 400, 100)
 
 
+def create_mob_spawner():
+    """(MobSpawner) Returns a spawner for the mobs that live on the surface of the world"""
+    spawner = MobSpawner()
+
+    spawner.add_species(lambda: Sheep("sheep", (60, 30)), weight=3, surfaces={'dirt'})
+    spawner.add_species(lambda: Bird("friendly_bird", (12, 12)), weight=2, height=4)
+    spawner.add_species(lambda: Bee("bee", (5, 5)), weight=1, surfaces={'leaf'})
+
+    return spawner
+
+
 class Ninedraft:
     """High-level app class for Ninedraft, a 2d sandbox game"""
 
@@ -786,6 +1032,10 @@ class Ninedraft:
         self._world = World((GRID_WIDTH, GRID_HEIGHT), BLOCK_SIZE)
         master.title('Ninedraft')
         load_simple_world(self._world)
+        self._world.add_system(create_mob_spawner())
+
+        if PHYSICS_METRICS_FILE is not None:
+            self._world.add_system(PhysicsMetricsWriter(PHYSICS_METRICS_FILE))
 
         self._player = Player()
         self._world.add_player(self._player, 250, 150)
@@ -822,17 +1072,32 @@ class Ninedraft:
         for position, stack in starting_inventory:
             self._inventory[position] = stack
 
-        self._crafting_window = None
-        self._master.bind("e",
-                          lambda e: self.run_effect(('crafting', 'basic')))
+        self._recipe_book = RecipeBook(create_item)
+        self._recipe_book.load()
+
+        recipes = [recipe for craft_type in self._recipe_book.get_craft_types()
+                   for recipe in self._recipe_book.get_index(craft_type)]
+        self._craftable = CraftableTracker(recipes, (self._hot_bar, self._inventory))
+
+        # craft type -> planner over the recipes usable while crafting with that type
+        self._planners = {}
+        for craft_type in self._recipe_book.get_craft_types():
+            planner_recipes = [recipe for source in AUTO_CRAFT_TYPES.get(craft_type, (craft_type,))
+                               for recipe in self._recipe_book.get_index(source)]
+            self._planners[craft_type] = CraftingPlanner(planner_recipes, raw_materials=RAW_MATERIALS)
+
+        # Crafting windows are hidden rather than destroyed when closed, and reused by craft type
+        self._crafting_windows = {}
 
         self._view = GameView(master, self._world.get_pixel_size(), NewWorldViewRouter(BLOCK_COLOURS, ITEM_COLOURS))
         self._view.pack()
 
+        # Keyboard & mouse motion are polled once per step; see _handle_input
+        self._input = InputState(master)
+        self._input.track_mouse(self._view)
+
         # Task 1.2 Mouse Controls: Bind mouse events here
         # ...
-        self._view.bind("<Motion>", self._mouse_move)
-        self._view.bind("<Leave>", self._mouse_leave)
         self._master.bind("<Button-1>", self._left_click)
         self._view.bind("<Button-3>", self._right_click)
 
@@ -849,26 +1114,16 @@ class Ninedraft:
 
         # Task 1.5 Keyboard Controls: Bind to space bar for jumping here
         # ...
-        self._master.bind("<space>", lambda e: self._jump())
-        self._master.bind("a", lambda e: self._move(-1, 0))
-        self._master.bind("<Left>", lambda e: self._move(-1, 0))
-        self._master.bind("d", lambda e: self._move(1, 0))
-        self._master.bind("<Right>", lambda e: self._move(1, 0))
-        self._master.bind("s", lambda e: self._move(0, 1))
-        self._master.bind("<Down>", lambda e: self._move(0, 1))
+        # (movement keys are polled each step, see MOVEMENT_KEYS)
+        for key in JUMP_KEYS:
+            self._input.bind_press(key, self._jump)
+
+        self._input.bind_press("e", lambda: self.run_effect(('crafting', 'basic')))
 
         # Task 1.5 Keyboard Controls: Bind numbers to hotbar activation here
         # ...
-        self._master.bind("1", lambda e: self._hot_bar.select((0, 0)))
-        self._master.bind("2", lambda e: self._hot_bar.select((0, 1)))
-        self._master.bind("3", lambda e: self._hot_bar.select((0, 2)))
-        self._master.bind("4", lambda e: self._hot_bar.select((0, 3)))
-        self._master.bind("5", lambda e: self._hot_bar.select((0, 4)))
-        self._master.bind("6", lambda e: self._hot_bar.select((0, 5)))
-        self._master.bind("7", lambda e: self._hot_bar.select((0, 6)))
-        self._master.bind("8", lambda e: self._hot_bar.select((0, 7)))
-        self._master.bind("9", lambda e: self._hot_bar.select((0, 8)))
-        self._master.bind("0", lambda e: self._hot_bar.select((0, 9)))
+        for i, key in enumerate(HOTBAR_KEYS):
+            self._input.bind_press(key, lambda i=i: self._hot_bar.select((0, i)))
 
         # Task 1.6 File Menu & Dialogs: Add file menu here
         # ...
@@ -883,6 +1138,8 @@ class Ninedraft:
 
         self._target_in_range = False
         self._target_position = 0, 0
+        # The block hit by the ray from the player to the target position, if in range (see World.raycast)
+        self._target_hit = None
 
         self.redraw()
 
@@ -893,7 +1150,7 @@ class Ninedraft:
 
         answer = messagebox.askyesno(title='New Game?', message='Are you sure you would like to start a new game?')
         if answer:
-            for thing in self._world.get_all_things():
+            for thing in list(self._world.get_all_things()):
                 self._world.remove_thing(thing)
             load_simple_world(self._world)
             self._player = Player()
@@ -936,20 +1193,21 @@ class Ninedraft:
             self._master.destroy()
 
     def redraw(self):
-        self._view.delete(tk.ALL)
+        self._view.clear_physical()
 
         # physical things
         self._view.draw_physical(self._world.get_all_things())
 
-        # target
-        target_x, target_y = self._target_position
-        target = self._world.get_block(target_x, target_y)
-        cursor_position = self._world.grid_to_xy_centre(*self._world.xy_to_grid(target_x, target_y))
-
         # Task 1.2 Mouse Controls: Show/hide target here
         # ...
-        self._view.show_target(self._player.get_position(), self._target_position)
-        if not self._target_in_range:
+        if self._target_in_range:
+            if self._target_hit:
+                target_position = self._world.grid_to_xy_centre(*self._target_hit.cell)
+            else:
+                target_position = self._target_position
+
+            self._view.show_target(self._player.get_position(), target_position, self._target_position)
+        else:
             self._view.hide_target()
 
 
@@ -960,9 +1218,11 @@ class Ninedraft:
         self._statusview.set_food(self._player.get_food())
 
         # hot bar
-        self._hot_bar_view.render(self._hot_bar.items(), self._hot_bar.get_selected())
+        self._hot_bar_view.refresh(self._hot_bar, self._hot_bar.get_selected())
 
     def step(self):
+        self._handle_input()
+
         data = GameData(self._world, self._player)
         self._world.step(data)
         self.redraw()
@@ -974,13 +1234,39 @@ class Ninedraft:
 
         self._master.after(15, self.step)
 
+    def _handle_input(self):
+        """Applies the keyboard & mouse input since the last step, once per step"""
+        mouse_moved = self._input.poll()
+
+        dx, dy = self._input.get_direction(MOVEMENT_KEYS)
+        if dx or dy:
+            self._move(dx, dy)
+
+        mouse_position = self._input.get_mouse_position()
+
+        if mouse_position is None:
+            self._target_in_range = False
+        elif mouse_moved or self._player.get_velocity().get_length_sqrd() > 0:
+            self._target_position = mouse_position
+            self.check_target()
+
     def _move(self, dx, dy):
-        self.check_target()
         velocity = self._player.get_velocity()
-        self._player.set_velocity((velocity.x + dx * 80, velocity.y + dy * 80))
+        self._player.set_velocity((self._accelerate(velocity.x, dx), self._accelerate(velocity.y, dy)))
+
+    @staticmethod
+    def _accelerate(speed, direction):
+        """(float) Returns 'speed' after moving in 'direction' (-1, 0 or 1) for one step"""
+        if not direction:
+            return speed
+
+        new_speed = speed + direction * PLAYER_MOVE_IMPULSE
+
+        # movement can't push the player beyond the maximum speed, but doesn't slow them down either
+        limit = max(PLAYER_MAX_SPEED, abs(speed))
+        return max(-limit, min(new_speed, limit))
 
     def _jump(self):
-        self.check_target()
         velocity = self._player.get_velocity()
         # Task 1.2: Update the player's velocity here
         # ...
@@ -995,6 +1281,10 @@ class Ninedraft:
         was_item_suitable, was_attack_successful = block.mine(effective_item, active_item, luck)
 
         effective_item.attack(was_attack_successful)
+
+        # durability isn't tracked by the hotbar, so mark the active cell for redrawing
+        if active_item is effective_item and self._hot_bar.get_selected():
+            self._hot_bar.touch(self._hot_bar.get_selected())
         # if the block has been mined
 
 
@@ -1008,7 +1298,7 @@ class Ninedraft:
 
             # Task 1.2 Mouse Controls: Remove the block from the world & get its drops
             # ...
-            self._world.remove_item(block)
+            self._world.remove_block(block)
             if luck < 1:
                 drops = block.get_drops(luck, was_item_suitable)
             # Have a look at the World class for removing
@@ -1019,19 +1309,37 @@ class Ninedraft:
 
             x0, y0 = block.get_position()
 
-            for i, (drop_category, drop_types) in enumerate(drops):
+            # identical items are dropped together, as one stack
+            item_drops = {}
+            other_drops = []
+
+            for drop_category, drop_types in drops:
                 print(f'Dropped {drop_category}, {drop_types}')
 
                 if drop_category == "item":
-                    physical = DroppedItem(create_item(*drop_types))
+                    item_drops[drop_types] = item_drops.get(drop_types, 0) + 1
+                else:
+                    other_drops.append((drop_category, drop_types))
+
+            i = 0
+            for drop_types, quantity in item_drops.items():
+                while quantity > 0:
+                    item = create_item(*drop_types)
+                    count = min(quantity, item.get_max_stack_size())
+                    quantity -= count
+
+                    physical = DroppedItem(item, count)
 
                     # this is so bleh
                     x = x0 - BLOCK_SIZE // 2 + 5 + (i % 3) * 11 + random.randint(0, 2)
                     y = y0 - BLOCK_SIZE // 2 + 5 + ((i // 3) % 3) * 11 + random.randint(0, 2)
+                    i += 1
 
                     self._world.add_item(physical, x, y)
-                elif drop_category == "block":
-                    self._world.add_block(create_block(*drop_types), x, y)
+
+            for drop_category, drop_types in other_drops:
+                if drop_category == "block":
+                    self._world.add_block(create_block(*drop_types), x0, y0)
                 else:
                     raise KeyError(f"Unknown drop category {drop_category}")
 
@@ -1048,27 +1356,34 @@ class Ninedraft:
         active_item, effective_item = self.get_holding()
 
         pixel_range = active_item.get_attack_range() * self._world.get_cell_expanse()
+        player_position = self._player.get_position()
 
-        self._target_in_range = positions_in_range(self._player.get_position(),
-                                                   self._target_position,
-                                                   pixel_range)
+        # the target is the first block between the player & the cursor, so blocks can't be reached through terrain
+        hit = self._world.raycast(player_position, self._target_position)
 
-    def _mouse_move(self, event):
-        self._target_position = event.x, event.y
-        self.check_target()
+        if hit is None:
+            self._target_in_range = positions_in_range(player_position, self._target_position, pixel_range)
+        else:
+            self._target_in_range = hit.distance <= pixel_range
 
-    def _mouse_leave(self, event):
-        self._target_in_range = False
+        self._target_hit = hit if self._target_in_range else None
 
     def _left_click(self, event):
-        # Invariant: (event.x, event.y) == self._target_position
-        #  => Due to mouse move setting target position to cursor
+        # clicks are bound on the whole window, but only those on the world view target the world
+        if event.widget is not self._view:
+            return
+
+        # mouse motion is only applied when polled, so the click may be ahead of the target
+        if (event.x, event.y) != self._target_position:
+            self._target_position = event.x, event.y
+            self.check_target()
+
         x, y = self._target_position
 
         if self._target_in_range:
-            block = self._world.get_block(x, y)
-            if block:
-                self.mine_block(block, x, y)
+            if self._target_hit:
+                self.mine_block(self._target_hit.block, x, y)
+                self.check_target()
             elif "Sheep('sheep')":
                 block = WoolBlock("wool", "wood")
                 block.get_drops(1, True)
@@ -1076,150 +1391,79 @@ class Ninedraft:
 
     def _trigger_crafting(self, craft_type):
         print(f"Crafting with {craft_type}")
-        CRAFTING_RECIPES_2x2 = [
-            (
-                (
-                    (None, 'wood'),
-                    (None, 'wood')
-                ),
-                Stack(create_item('stick'), 4)
-            ),
-            (
-                (
-                    ('wood', 'wood'),
-                    ('wood', 'wood')
-                ),
-                Stack(create_item('crafting_table'), 1)
-            ),
-            (
-                (
-                    ('dirt', 'dirt'),
-                    ('dirt', 'dirt')
-                ),
-                Stack(create_item('wood'), 1)
-            ),
-            (
-                (
-                    ('stone', 'stone'),
-                    ('stone', 'stone')
-                ),
-                Stack(create_item('diamond'), 1)
-            ),
-            (
-                (
-                    ('apple', 'apple'),
-                    ('apple', 'apple')
-                ),
-                Stack(create_item('honey'), 1)
-            ),
-        ]
 
-        CRAFTING_RECIPES_3x3 = {
-            (
-                (
-                    (None, None, None),
-                    (None, 'wood', None),
-                    (None, 'wood', None)
-                ),
-                Stack(create_item('stick'), 16)
-            ),
-            (
-                (
-                    ('wood', 'wood', 'wood'),
-                    (None, 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('pickaxe', 'wood'), 1)
-            ),
-            (
-                (
-                    ('stone', 'stone', 'stone'),
-                    (None, 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('pickaxe', 'stone'), 1)
-            ),
-            (
-                (
-                    ('diamond', 'diamond', 'diamond'),
-                    (None, 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('pickaxe', 'diamond'), 1)
-            ),
-            (
-                (
-                    ('wood', 'wood', None),
-                    ('wood', 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('axe', 'wood'), 1)
-            ),
-            (
-                (
-                    ('stone', 'stone', None),
-                    ('wood', 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('axe', 'stone'), 1)
-            ),
-            (
-                (
-                    (None, 'wood', None),
-                    (None, 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('shovel', 'wood'), 1)
-            ),
-            (
-                (
-                    (None, 'stone', None),
-                    (None, 'stick', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('shovel', 'stone'), 1)
-            ),
-            (
-                (
-                    (None, 'wood', None),
-                    (None, 'wood', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('sword', 'wood'), 1)
-            ),
-            (
-                (
-                    (None, 'stone', None),
-                    (None, 'stone', None),
-                    (None, 'stick', None)
-                ),
-                Stack(create_item('sword', 'stone'), 1)
-            ),
-            (
-                (
-                    (None, None, None),
-                    ('wool', 'wool', 'wool'),
-                    ('wood', 'wood', 'wood')
-                ),
-                Stack(create_item('bed'), 1)
-            ),
-            (
-                (
-                    ('stone', 'stone', 'stone'),
-                    ('stone', None, 'stone'),
-                    ('stone', 'stone', 'stone')
-                ),
-                Stack(create_item('furnace'), 1)
-            )
-        }
+        window = self._crafting_windows.get(craft_type)
 
-        if craft_type == "basic":
-            crafter = GridCrafter(CRAFTING_RECIPES_2x2, 2, 2)
-        else:
-            crafter = GridCrafter(CRAFTING_RECIPES_3x3, 3, 3)
+        if window is not None and window.winfo_exists():
+            window.show()
+            return
+
+        recipes = self._recipe_book.get_index(craft_type)
+        crafter = GridCrafter(recipes, *recipes.get_size())
+
+        auto_craft = (self._planners[craft_type].get_craftable_ids(),
+                      lambda item_id: self.auto_craft(item_id, craft_type=craft_type))
 
-        self._crafting_window = CraftingWindow(self._master, craft_type, hot_bar=self._hot_bar,
-                                               inventory=self._inventory, crafter=crafter)
+        self._crafting_windows[craft_type] = CraftingWindow(self._master, craft_type, hot_bar=self._hot_bar,
+                                                            inventory=self._inventory, crafter=crafter,
+                                                            tracker=self._craftable, auto_craft=auto_craft)
+
+    def auto_craft(self, item_id, quantity=1, craft_type='basic'):
+        """Crafts 'quantity' of 'item_id' from the hotbar & inventory, crafting any intermediate
+        items that are needed along the way
+
+        Parameters:
+            item_id (str): The id of the item to craft (i.e. 'stone_pickaxe')
+            quantity (int): The quantity to craft
+            craft_type (str): The type of crafting being used (i.e. 'crafting_table'), which limits
+                              the recipes that can be used (see AUTO_CRAFT_TYPES)
+
+        Return:
+            bool: True iff the item was crafted
+        """
+        try:
+            steps = self._planners[craft_type].plan(item_id, quantity, self._craftable.get_counts())
+        except (KeyError, MissingMaterialsError) as error:
+            print(error)
+            return False
+
+        for recipe, times in steps:
+            for ingredient, count in get_requirements(recipe).items():
+                remaining = count * times
+                for grid in (self._hot_bar, self._inventory):
+                    remaining -= grid.remove_items(ingredient, remaining)
+
+            item = recipe[1].get_item()
+            remaining = recipe[1].get_quantity() * times
+
+            while remaining > 0:
+                if item.is_stackable():
+                    count = min(remaining, item.get_max_stack_size())
+                    stack = Stack(item, count)
+                else:
+                    # unstackable items (i.e. tools) each carry their own durability, so each gets its own copy
+                    count = 1
+                    stack = Stack(copy.copy(item), count)
+
+                remaining -= count
+                self._collect(stack)
+
+            print(f"Crafted {recipe[1]} {times} times")
+
+        return True
+
+    def _collect(self, stack):
+        """Adds 'stack' to the hotbar, or inventory if the hotbar is full, dropping whatever doesn't fit"""
+        for grid in (self._hot_bar, self._inventory):
+            stack = grid.add_items(stack)
+
+            if stack is None:
+                return
+
+        print(f"Both hotbar & inventory are full, dropping {stack}")
+        x, y = self._player.get_position()
+
+        self._world.add_item(DroppedItem(stack.get_item(), stack.get_quantity()), x, y - BLOCK_SIZE)
 
     def run_effect(self, effect):
         if len(effect) == 2:
@@ -1235,6 +1479,10 @@ class Ninedraft:
                 self._trigger_crafting(craft_type)
                 return
 
+            elif effect[0] == "auto_craft":
+                self.auto_craft(effect[1])
+                return
+
             elif effect[0] in ("food", "health"):
                 stat, strength = effect
 
@@ -1254,7 +1502,8 @@ class Ninedraft:
         print("Right click")
 
         x, y = self._target_position
-        target = self._world.get_thing(x, y)
+        hit = self._target_hit
+        target = hit.block if hit else self._world.get_thing(x, y)
 
         if target:
             # use this thing
@@ -1264,49 +1513,62 @@ class Ninedraft:
 
             if effect:
                 self.run_effect(effect)
-
-        else:
-            # place active item
-            selected = self._hot_bar.get_selected()
-
-            if not selected:
                 return
 
-            stack = self._hot_bar[selected]
-            if not stack:
+            # blocks that can't be used have the active item placed against them, but other things don't
+            if hit is None:
                 return
-            drops = stack.get_item().place()
 
-            stack.subtract(1)
-            if stack.get_quantity() == 0:
-                # remove from hotbar
-                self._hot_bar[selected] = None
+        if hit is not None and hit.face is None:
+            # the player is inside the targeted block, so there is no face to place against
+            return
 
-            if not drops:
-                return
+        # place active item
+        selected = self._hot_bar.get_selected()
 
-            # handling multiple drops would be somewhat finicky, so prevent it
-            if len(drops) > 1:
-                raise NotImplementedError("Cannot handle dropping more than 1 thing")
+        if not selected:
+            return
 
-            drop_category, drop_types = drops[0]
+        stack = self._hot_bar[selected]
+        if not stack:
+            return
+        drops = stack.get_item().place()
 
-            x, y = event.x, event.y
+        stack.subtract(1)
+        if stack.get_quantity() == 0:
+            # remove from hotbar
+            self._hot_bar[selected] = None
 
-            if drop_category == "block":
-                existing_block = self._world.get_block(x, y)
+        if not drops:
+            return
 
-                if not existing_block:
-                    self._world.add_block(create_block(drop_types[0]), x, y)
-                else:
-                    raise NotImplementedError(
-                        "Automatically placing a block nearby if the target cell is full is not yet implemented")
+        # handling multiple drops would be somewhat finicky, so prevent it
+        if len(drops) > 1:
+            raise NotImplementedError("Cannot handle dropping more than 1 thing")
 
-            elif drop_category == "effect":
-                self.run_effect(drop_types)
+        drop_category, drop_types = drops[0]
+
+        if drop_category == "block":
+            if hit is not None:
+                # place against the face of the targeted block
+                column, row = hit.cell
+                dx, dy = hit.face
+                self._world.add_block_to_grid(create_block(drop_types[0]), column + dx, row + dy)
+
+            elif not self._world.get_block(x, y):
+                self._world.add_block(create_block(drop_types[0]), x, y)
 
             else:
-                raise KeyError(f"Unknown drop category {drop_category}")
+                raise NotImplementedError(
+                    "Automatically placing a block nearby if the target cell is full is not yet implemented")
+
+            self.check_target()
+
+        elif drop_category == "effect":
+            self.run_effect(drop_types)
+
+        else:
+            raise KeyError(f"Unknown drop category {drop_category}")
 
     def _activate_item(self, index):
         print(f"Activating {index}")
@@ -1333,13 +1595,20 @@ class Ninedraft:
         """
 
         item = dropped_item.get_item()
+        stack = dropped_item.get_stack()
+
+        # the whole stack is picked up, filling the hotbar before the inventory
+        for name, grid in (("hotbar", self._hot_bar), ("inventory", self._inventory)):
+            quantity = stack.get_quantity()
+
+            if grid.add_items(stack) is None:
+                print(f"Added {quantity} {item!r} to the {name}")
+                break
 
-        if self._hot_bar.add_item(item):
-            print(f"Added 1 {item!r} to the hotbar")
-        elif self._inventory.add_item(item):
-            print(f"Added 1 {item!r} to the inventory")
+            if stack.get_quantity() < quantity:
+                print(f"Added {quantity - stack.get_quantity()} {item!r} to the {name}")
         else:
-            print(f"Found 1 {item!r}, but both hotbar & inventory are full")
+            print(f"Found {stack.get_quantity()} {item!r}, but both hotbar & inventory are full")
             return True
 
         self._world.remove_item(dropped_item)
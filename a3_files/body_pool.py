@@ -0,0 +1,123 @@
+"""
+Recycles the pymunk bodies & shapes of things that are frequently added & removed (i.e. dropped items & mobs)
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import pymunk
+
+# The most bodies kept for reuse in each size class; beyond that, released bodies are discarded
+MAX_POOLED_PER_SIZE = 64
+
+
+class BodyPool:
+    """Keeps the (body, shape) pairs of removed things, to be reused by things of the same size
+
+    Each pair is a dynamic body with a rectangular shape, centred on the body. Pairs are grouped
+    by the (width, height) size of their shape, which can't be changed once a shape is created.
+    """
+
+    def __init__(self, max_per_size=MAX_POOLED_PER_SIZE):
+        """Constructor
+
+        Parameters:
+            max_per_size (int): The most pairs kept for reuse in each size class
+        """
+        self._max_per_size = max_per_size
+
+        # size -> list of free (body, shape) pairs
+        self._free = {}
+        # shape -> size, for each shape created by this pool that is in use
+        self._sizes = {}
+
+        self._stats = {'hits': 0, 'misses': 0, 'released': 0, 'discarded': 0}
+
+    def acquire(self, size, mass, x, y):
+        """Returns a body & shape for a thing of 'size', reusing a released pair if possible
+
+        The body is reset to rest at ('x', 'y'), & the shape's collision properties to their defaults
+
+        Parameters:
+            size (tuple<float, float>): The (width, height) size of the shape
+            mass (float): The mass of the body
+            x (float): The x-coordinate at which to place the body
+            y (float): The y-coordinate at which to place the body
+
+        Return:
+            tuple<pymunk.Body, pymunk.Shape>: The body & its shape
+        """
+        free = self._free.get(size)
+
+        if free:
+            body, shape = free.pop()
+            self._stats['hits'] += 1
+
+            body.mass = mass
+            body.velocity = 0, 0
+            body.force = 0, 0
+            body.angle = 0
+            body.angular_velocity = 0
+
+            shape.object = None
+            shape.collision_type = 0
+            shape.filter = pymunk.ShapeFilter()
+            shape.friction = 0
+            shape.elasticity = 0
+            shape.sensor = False
+        else:
+            width, height = size
+
+            left = -width // 2
+            right = left + width
+            top = -height // 2
+            bottom = top + height
+
+            body = pymunk.Body(mass, pymunk.inf)
+            shape = pymunk.Poly(body, [(left, top), (left, bottom), (right, bottom), (right, top)])
+            self._stats['misses'] += 1
+
+        body.position = x, y
+        self._sizes[shape] = size
+
+        return body, shape
+
+    def release(self, body, shape):
+        """Returns a body & shape to the pool, once they have been removed from the space
+
+        Parameters:
+            body (pymunk.Body): The body to release
+            shape (pymunk.Shape): The shape of the body
+
+        Return:
+            bool: True iff the pair was created by this pool (whether or not it is kept for reuse)
+        """
+        size = self._sizes.pop(shape, None)
+        if size is None:
+            return False
+
+        self._stats['released'] += 1
+        free = self._free.setdefault(size, [])
+
+        if len(free) < self._max_per_size:
+            free.append((body, shape))
+        else:
+            self._stats['discarded'] += 1
+
+        return True
+
+    def get_stats(self):
+        """Returns statistics about the reuse of bodies
+
+        Return:
+            dict: The number of acquired bodies that were reused ('hits') & created ('misses'), the 'hit_rate'
+                  of acquisitions that were reused, the number of bodies 'released', & 'discarded' since their
+                  size class was full, & the number of bodies 'pooled' for reuse & 'in_use'
+        """
+        acquired = self._stats['hits'] + self._stats['misses']
+
+        return dict(self._stats,
+                    hit_rate=self._stats['hits'] / acquired if acquired else 0,
+                    pooled=sum(len(free) for free in self._free.values()),
+                    in_use=len(self._sizes))
@@ -0,0 +1,109 @@
+"""
+Chooses & configures the broadphase of a physics space, which finds the pairs of shapes that may be colliding
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import time
+
+import pymunk
+
+# Names of each broadphase
+#   - tree: pymunk's default bounding box tree, which adapts to shapes of any size
+#   - hash: pymunk's spatial hash, which suits many shapes of about the same size (i.e. blocks)
+BROADPHASES = {"tree", "hash"}
+
+# The size of the spatial hash's cells, as a multiple of the cell expanse
+SPATIAL_HASH_CELL_SCALE = 1
+# The number of spatial hash cells per shape; pymunk suggests about ten
+SPATIAL_HASH_COUNT_SCALE = 10
+# The expected number of shapes per column of the grid; a few exposed blocks around the surface (buried
+# blocks have no shape, see World.add_block_to_grid) & the things moving over them
+SHAPES_PER_COLUMN = 4
+
+# The calibration benchmark drops some bodies onto a floor of blocks & steps the space a few times,
+# repeatedly, taking the fastest repeat to reduce noise
+CALIBRATION_BODIES = 100
+CALIBRATION_STEPS = 20
+CALIBRATION_REPEATS = 3
+CALIBRATION_TIME_STEP = 1 / 50
+
+
+def use_spatial_hash(space, grid_size, cell_expanse):
+    """Switches 'space' to a spatial hash, with cells the size of grid cells, sized for the shapes expected
+    in a grid of 'grid_size' (see SHAPES_PER_COLUMN)
+
+    Parameters:
+        space (pymunk.Space): The space to configure
+        grid_size (tuple<int, int>): The (column, row) size of the grid
+        cell_expanse (int): The size (i.e. width/height) of each grid cell
+    """
+    columns, _ = grid_size
+    count = columns * SHAPES_PER_COLUMN * SPATIAL_HASH_COUNT_SCALE
+
+    space.use_spatial_hash(cell_expanse * SPATIAL_HASH_CELL_SCALE, count)
+
+
+def _create_calibration_space(broadphase, grid_size, cell_expanse):
+    """(pymunk.Space) Returns a space using 'broadphase', with a floor of blocks across the middle of
+    the grid & bodies stacked above it
+
+    Only the surface of the floor is added, since buried blocks have no shape in the world's space
+    (see World.add_block_to_grid)
+    """
+    columns, rows = grid_size
+    floor = max(1, rows // 2)
+
+    space = pymunk.Space()
+    space.gravity = 0, 300
+
+    if broadphase == "hash":
+        use_spatial_hash(space, grid_size, cell_expanse)
+
+    for column in range(columns):
+        left, top = column * cell_expanse, floor * cell_expanse
+        right, bottom = left + cell_expanse, top + cell_expanse
+        space.add(pymunk.Poly(space.static_body, [(left, top), (left, bottom), (right, bottom), (right, top)]))
+
+    size = cell_expanse / 2
+    for i in range(CALIBRATION_BODIES):
+        column, height = i % columns, i // columns % floor
+
+        body = pymunk.Body(1, pymunk.inf)
+        body.position = (column + .5) * cell_expanse, (floor - height - .5) * cell_expanse
+        space.add(body, pymunk.Poly.create_box(body, (size, size)))
+
+    return space
+
+
+def calibrate_broadphase(grid_size, cell_expanse):
+    """Times each broadphase on a small scene like the world's, of blocks & bodies resting on them
+
+    Parameters:
+        grid_size (tuple<int, int>): The (column, row) size of the grid
+        cell_expanse (int): The size (i.e. width/height) of each grid cell
+
+    Return:
+        dict<str: float>: The time (in seconds) each broadphase took to step the scene, at best
+    """
+    timings = {}
+
+    for broadphase in sorted(BROADPHASES):
+        fastest = None
+
+        for _ in range(CALIBRATION_REPEATS):
+            space = _create_calibration_space(broadphase, grid_size, cell_expanse)
+
+            start = time.perf_counter()
+            for _ in range(CALIBRATION_STEPS):
+                space.step(CALIBRATION_TIME_STEP)
+            elapsed = time.perf_counter() - start
+
+            if fastest is None or elapsed < fastest:
+                fastest = elapsed
+
+        timings[broadphase] = fastest
+
+    return timings
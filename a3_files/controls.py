@@ -0,0 +1,130 @@
+"""
+Polled keyboard & mouse input, so that input is applied once per game step rather than once per tkinter event
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+
+class InputState:
+    """Tracks which keys are held down & where the mouse is, to be polled once per step
+
+    Holding a key down makes tkinter repeat its events (an auto-repeat), which would otherwise
+    make the key repeat rate determine how often input is handled. Here, a key is pressed when
+    it first goes down and held until it is released; auto-repeats are ignored. Releases are only
+    applied when polled, so an auto-repeat release followed by a press in the same step has no effect.
+    """
+
+    def __init__(self, widget):
+        """Constructor
+
+        Parameters:
+            widget (tk.Widget): The widget that receives keyboard events (usually the root window)
+        """
+        self._held = set()
+        self._released = set()
+        self._pressed = []
+        self._down = set()
+
+        self._press_actions = {}
+
+        self._mouse_position = None
+        self._mouse_moved = False
+
+        widget.bind("<KeyPress>", self._handle_press, add="+")
+        widget.bind("<KeyRelease>", self._handle_release, add="+")
+        # keys released while another window has focus are never seen, so are released on losing focus
+        widget.bind("<FocusOut>", self._handle_focus_out, add="+")
+
+    def bind_press(self, key, callback):
+        """Calls 'callback' once, when polled, each time 'key' is pressed (auto-repeats excluded)
+
+        Parameters:
+            key (str): The tkinter keysym of the key (i.e. 'a', 'space', 'Left')
+            callback (function): Called without arguments
+        """
+        self._press_actions.setdefault(key, []).append(callback)
+
+    def track_mouse(self, widget):
+        """Tracks the position of the mouse within 'widget'"""
+        widget.bind("<Motion>", self._handle_motion, add="+")
+        widget.bind("<Leave>", self._handle_leave, add="+")
+
+    def _handle_press(self, event):
+        key = event.keysym
+
+        if key in self._released:
+            # auto-repeat, released & pressed again since the last poll
+            self._released.discard(key)
+        elif key not in self._held:
+            self._held.add(key)
+            self._pressed.append(key)
+
+    def _handle_release(self, event):
+        if event.keysym in self._held:
+            self._released.add(event.keysym)
+
+    def _handle_focus_out(self, event):
+        self._held.clear()
+        self._released.clear()
+
+    def _handle_motion(self, event):
+        self._mouse_position = event.x, event.y
+        self._mouse_moved = True
+
+    def _handle_leave(self, event):
+        self._mouse_position = None
+        self._mouse_moved = True
+
+    def poll(self):
+        """Applies all input since the last poll; should be called once per step
+
+        Calls the press actions of each newly pressed key. Keys pressed & released since the
+        last poll are still considered down until the next poll, so short taps aren't lost.
+
+        Return:
+            bool: True iff the mouse has moved since the last poll
+        """
+        pressed = self._pressed
+        self._pressed = []
+
+        for key in pressed:
+            for callback in self._press_actions.get(key, ()):
+                callback()
+
+        self._down = set(self._held)
+        self._held -= self._released
+        self._released.clear()
+
+        moved = self._mouse_moved
+        self._mouse_moved = False
+        return moved
+
+    def is_down(self, key):
+        """(bool) Returns True iff 'key' was down at the last poll"""
+        return key in self._down
+
+    def get_direction(self, bindings):
+        """Returns the combined direction of all keys that were down at the last poll
+
+        Parameters:
+            bindings (dict<str: tuple<int, int>>): A mapping of keysyms to (x, y) directions
+
+        Return:
+            tuple<int, int>: The sum of the directions of the keys that are down, with each
+                             component limited to between -1 & 1
+        """
+        dx = dy = 0
+
+        for key in self._down:
+            if key in bindings:
+                x, y = bindings[key]
+                dx += x
+                dy += y
+
+        return max(-1, min(dx, 1)), max(-1, min(dy, 1))
+
+    def get_mouse_position(self):
+        """(tuple<int, int>) Returns the last (x, y) position of the mouse, or None if it has left the widget"""
+        return self._mouse_position
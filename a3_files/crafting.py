@@ -8,12 +8,141 @@ __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
 import tkinter as tk
+import copy
 
 from core import TK_MOUSE_EVENTS
-from grid import Grid, SelectableGrid, ItemGridView
+from grid import Stack, Grid, SelectableGrid, ItemGridView
 from core import get_modifiers
 
 
+def normalise_pattern(pattern):
+    """Trims the empty rows & columns from the edges of a crafting pattern
+
+    The same shape placed in any part of the crafting grid normalises to the same pattern, e.g.
+        ((None, 'wood', None),         (('wood',),
+         (None, 'wood', None),   =>     ('wood',))
+         (None, None, None))
+
+    Parameters:
+        pattern (tuple<tuple<str>>): A 2d-tuple of item ids, with None for empty cells
+
+    Return:
+        tuple<tuple<str>>: The smallest 2d-tuple containing every ingredient of 'pattern',
+                           or an empty tuple if 'pattern' has no ingredients
+    """
+    rows = [i for i, row in enumerate(pattern) if any(cell is not None for cell in row)]
+
+    if not rows:
+        return ()
+
+    columns = [j for j in range(len(pattern[0])) if any(row[j] is not None for row in pattern)]
+
+    top, bottom = rows[0], rows[-1] + 1
+    left, right = columns[0], columns[-1] + 1
+
+    return tuple(tuple(row[left:right]) for row in pattern[top:bottom])
+
+
+def shapeless_key(ingredients):
+    """(tuple<str>) Returns the sorted multiset of item ids in 'ingredients'
+
+    Parameters:
+        ingredients (tuple<tuple<str>> | tuple<str>):
+                A 2d crafting pattern, or a flat tuple of item ids; None is ignored
+    """
+    if ingredients and isinstance(ingredients[0], tuple):
+        ingredients = (cell for row in ingredients for cell in row)
+
+    return tuple(sorted(cell for cell in ingredients if cell is not None))
+
+
+class RecipeIndex:
+    """A hashed lookup table of the recipes that fit in a row x column crafting grid
+
+    Shaped recipes are keyed by their normalised pattern (see normalise_pattern), so they
+    match wherever they are placed in the grid. Shapeless recipes are keyed by the sorted
+    multiset of their ingredients (see shapeless_key). Both lookups are constant time,
+    regardless of the number of recipes.
+    """
+
+    def __init__(self, rows=2, columns=2):
+        """Constructor
+
+        Parameters:
+            rows (int): The number of rows in the crafting input
+            columns (int): The number of columns in the crafting input
+        """
+        self._rows = rows
+        self._columns = columns
+
+        self._shaped = {}
+        self._shapeless = {}
+        self._recipes = []
+
+    def add(self, recipe):
+        """Adds a recipe to the index
+
+        If another recipe with the same key has already been added, it takes precedence
+
+        Parameters:
+            recipe (tuple<tuple<tuple<str>>, Stack> | tuple<tuple<str>, Stack, bool>):
+                    A pair of (ingredients & result) for a shaped recipe, or a triple of
+                    (ingredients, result, shapeless) where ingredients may be a flat tuple
+                    of item ids if shapeless is True
+
+        Raises:
+            ValueError: if the recipe has no ingredients, or cannot fit in the crafting input
+        """
+        ingredients, result = recipe[:2]
+        shapeless = len(recipe) > 2 and recipe[2]
+
+        if shapeless:
+            key = shapeless_key(ingredients)
+            fits = len(key) <= self._rows * self._columns
+            table = self._shapeless
+        else:
+            key = normalise_pattern(ingredients)
+            fits = len(key) <= self._rows and all(len(row) <= self._columns for row in key)
+            table = self._shaped
+
+        if not key:
+            raise ValueError(f"Recipe for {result} has no ingredients")
+
+        if not fits:
+            raise ValueError(f"Wrong recipe dimensions; expecting at most {self._rows}x{self._columns} "
+                             f"with {recipe}")
+
+        table.setdefault(key, recipe)
+        self._recipes.append(recipe)
+
+    def find(self, ingredients):
+        """Finds the recipe that matches ingredients, or None
+
+        Shaped recipes take precedence over shapeless ones
+
+        Parameters:
+            ingredients (tuple<tuple<str>>): The crafting pattern to search for
+        """
+        recipe = self._shaped.get(normalise_pattern(ingredients))
+
+        if recipe is None and self._shapeless:
+            recipe = self._shapeless.get(shapeless_key(ingredients))
+
+        return recipe
+
+    def get_size(self):
+        """(tuple<int, int>) Returns the (row, column) size of the crafting input"""
+        return self._rows, self._columns
+
+    def __iter__(self):
+        """Yields each recipe in this index, in the order it was added"""
+        yield from self._recipes
+
+    def __len__(self):
+        """(int) Returns the number of recipes in this index"""
+        return len(self._recipes)
+
+
 class GridCrafter:
     def __init__(self, recipes, rows=2, columns=2):
         """Initialises a row x column grid crafter with certain recipes
@@ -31,22 +160,31 @@ class GridCrafter:
                     >):
                     A list of pairs of (ingredients & result)
                     See CRAFTING_RECIPES_2x2, etc. in app.py
+                    A recipe may have a third element, shapeless (bool); see RecipeIndex.add
+                    Alternatively, an already compiled RecipeIndex, which is shared rather than copied
             rows (int): The number of rows in the crafting input
             columns (int): The number of rows in the crafting output
         """
         self._input = SelectableGrid(rows=rows, columns=columns)
         self._output = None
+        self._output_version = 0
         self._selected = None
 
-        for recipe in recipes:
-            if len(recipe) != rows and len(recipe[0]) != columns:
-                raise ValueError(f"Wrong recipe dimensions; expecting {rows}x{columns} but "
-                                 f"got {len(recipe)}x{len(recipe[0])} with {recipe}")
+        if isinstance(recipes, RecipeIndex):
+            index_rows, index_columns = recipes.get_size()
+            if index_rows > rows or index_columns > columns:
+                raise ValueError(f"Wrong recipe dimensions; expecting at most {rows}x{columns} but "
+                                 f"got {index_rows}x{index_columns} recipe index")
+
+            self._recipes = recipes
+        else:
+            self._recipes = RecipeIndex(rows, columns)
 
-        self._recipes = recipes
+            for recipe in recipes:
+                self._recipes.add(recipe)
 
     def find_match(self, ingredients):
-        """Finds the first recipe that matches ingredients
+        """Finds the recipe that matches ingredients, wherever they are placed in the grid
 
         Parameters:
             ingredients (tuple<
@@ -67,11 +205,7 @@ class GridCrafter:
             >: The result of crafting with these ingredients, or None
             (Recipes parameter of __init__ is a list of these)
         """
-        for recipe in self._recipes:
-            if ingredients == recipe[0]:
-                return recipe
-
-        return None
+        return self._recipes.find(ingredients)
 
     def craft(self):
         """Crafts the input to the output"""
@@ -83,11 +217,11 @@ class GridCrafter:
         if not recipe:
             print("No matching recipe")
         else:
-            result = recipe[1].copy()
+            result = self._create_result(recipe)
             print("Crafts to: ", result)
 
             if self._output is None:
-                self._output = result
+                self._set_output(result)
             elif self._output.matches(result) and self._output.get_space() > 0:
                 self._output.absorb(result)
             else:
@@ -97,17 +231,112 @@ class GridCrafter:
             # consume ingredients
             self.consume()
 
-    def consume(self):
-        """Consumes 1 of each ingredient"""
+    def craft_max(self):
+        """Crafts the input to the output as many times as the ingredients & output space allow,
+        in a single operation
+
+        Return:
+            int: The number of times the recipe was crafted
+        """
+        recipe = self.find_match(self._input.get_crafting_pattern())
+
+        if not recipe:
+            print("No matching recipe")
+            return 0
+
+        template = recipe[1]
+
+        if not template.get_item().is_stackable():
+            # each unstackable item (i.e. tool) carries its own durability, so needs a stack of its own
+            space = template.get_quantity() if self._output is None else 0
+        elif self._output is None:
+            space = template.get_item().get_max_stack_size()
+        elif self._output.matches(template):
+            space = self._output.get_space()
+        else:
+            space = 0
+
+        times = min(min(stack.get_quantity() for stack in self._input.values() if stack),
+                    space // template.get_quantity())
+
+        if times <= 0:
+            print("Can't craft when output is full")
+            return 0
+
+        result = self._create_result(recipe, times)
+        print(f"Crafts {times} times to: ", result)
+
+        if self._output is None:
+            self._set_output(result)
+        else:
+            self._output.absorb(result)
+
+        self.consume(times)
+
+        return times
+
+    def _create_result(self, recipe, times=1):
+        """(Stack) Returns a new stack of the result of crafting 'recipe' 'times' times"""
+        template = recipe[1]
+        item = template.get_item()
+
+        # Recipes are shared between crafters, so unstackable items (i.e. tools), which each
+        # carry their own durability, must not be handed out more than once
+        if not item.is_stackable():
+            item = copy.copy(item)
+
+        return Stack(item, template.get_quantity() * times)
+
+    def consume(self, count=1):
+        """Consumes 'count' of each ingredient"""
         for key, stack in self._input.items():
             if stack is None:
                 continue
 
-            stack.decrement()
+            stack.subtract(count)
 
             if len(stack) == 0:
                 self._input[key] = None
 
+    def _set_output(self, stack):
+        """Sets the output stack, watching it for changes in quantity"""
+        if self._output is not None:
+            self._output.unwatch(self._handle_output_change)
+
+        self._output = stack
+
+        if stack is not None:
+            stack.watch(self._handle_output_change)
+
+        self._output_version += 1
+
+    def _handle_output_change(self, stack, change):
+        """Records a change in quantity of the output stack"""
+        self._output_version += 1
+
+    def get_version(self):
+        """(tuple<int, int>) Returns the (input, output) versions of this crafter, which increase
+        whenever a cell changes (see Grid.get_version)"""
+        return self._input.get_version(), self._output_version
+
+    def get_changed(self, since):
+        """(list<*>) Returns the keys of the cells that have changed after the version 'since'
+
+        Parameters:
+            since (tuple<int, int>): A version previously returned by get_version
+        """
+        input_since, output_since = since
+        changed = self._input.get_changed(input_since)
+
+        if self._output_version > output_since:
+            changed.append("output")
+
+        return changed
+
+    def get_recipes(self):
+        """(RecipeIndex) Returns the recipes this crafter can craft"""
+        return self._recipes
+
     def get_input_size(self):
         """(tuple<int, int>) Returns the (row, column) size of the input grid"""
         return self._input.get_size()
@@ -128,7 +357,8 @@ class GridCrafter:
         self[key] = stack
         """
         if key == "output":
-            self._output = stack
+            if stack is not self._output:
+                self._set_output(stack)
         else:
             self._input[key] = stack
 
@@ -216,9 +446,16 @@ class GridCrafterView(tk.Frame):
         self._input_grid.pack(side=tk.LEFT)
         self._crafter_button = tk.Button(self, text="=> Craft =>")
         self._crafter_button.pack(side=tk.LEFT)
+        self._craft_max_button = tk.Button(self, text="=> Craft all =>")
+        self._craft_max_button.pack(side=tk.LEFT)
         self._output_grid = ItemGridView(self, (1, 1))
         self._output_grid.pack(side=tk.LEFT)
 
+        # The crafter last refreshed, and its version & selected key at that time
+        self._source = None
+        self._version = None
+        self._selected = None
+
 
     def render(self, key_stack_pairs, selected):
         """Renders the stacks at appropriate cells, as determined by 'key_stack_pairs'
@@ -244,6 +481,31 @@ class GridCrafterView(tk.Frame):
                 # ...
                 self._input_grid.draw_cell(key, stack, key == selected)
 
+    def refresh(self, crafter, selected):
+        """Redraws only the cells of 'crafter' that have changed since it was last refreshed
+
+        Parameters:
+            crafter (GridCrafter): The crafter to display
+            selected (*): The key that is currently selected, or None if no key is selected
+        """
+        version = crafter.get_version()
+
+        if crafter is not self._source:
+            keys = set(crafter.keys())
+        elif version == self._version and selected == self._selected:
+            return
+        else:
+            keys = set(crafter.get_changed(self._version))
+
+            if selected != self._selected:
+                keys.update(key for key in (self._selected, selected) if key is not None)
+
+        self.render(((key, crafter[key]) for key in keys), selected)
+
+        self._source = crafter
+        self._version = version
+        self._selected = selected
+
     def bind_for_id(self, event, callback):
         """Binds callback to tkinter mouse event
 
@@ -277,17 +539,104 @@ class GridCrafterView(tk.Frame):
         self._output_grid.bind(event, lambda e: callback("output", e))
 
         self._crafter_button.bind(event, lambda e: callback("craft", e))
+        self._craft_max_button.bind(event, lambda e: callback("craft_max", e))
 
     # Task 2.2 Crafting: You may add additional methods here
     # ...
 
 
 
+class RecipeBookView(tk.Frame):
+    """A tkinter widget listing the recipes that can be crafted now, and how many times"""
+
+    def __init__(self, master, height=6, width=32):
+        """Constructor
+
+        Parameters:
+            master (tk.Frame | tk.Toplevel | tk.Tk): Tkinter parent widget
+            height (int): The number of recipes visible at once
+            width (int): The width of the list, in characters
+        """
+        super().__init__(master)
+
+        self._title = tk.Label(self, text="Craftable now")
+        self._title.pack(side=tk.TOP)
+        self._list = tk.Listbox(self, height=height, width=width)
+        self._list.pack(side=tk.TOP, fill=tk.X)
+
+        self._version = None
+
+    def render(self, recipes, tracker):
+        """Lists each of 'recipes' that can be crafted now, if anything has changed since the last render
+
+        Parameters:
+            recipes (iterable<tuple>): The recipes to consider, in the order to list them
+            tracker (CraftableTracker): Tracks which recipes can be crafted (see recipe_book.py)
+        """
+        version = tracker.get_version()
+
+        if version == self._version:
+            return
+
+        self._version = version
+        craftable = tracker.get_craftable()
+
+        self._list.delete(0, tk.END)
+
+        for recipe in recipes:
+            times = craftable.get(recipe)
+
+            if times:
+                result = recipe[1]
+                self._list.insert(tk.END, f"{result.get_item().get_id()} x{result.get_quantity()} "
+                                          f"(craft {times}x)")
+
+
+class AutoCraftView(tk.Frame):
+    """A tkinter widget listing items that can be crafted automatically, crafting intermediate items
+    as needed (see CraftingPlanner), when double-clicked or chosen with the craft button"""
+
+    def __init__(self, master, item_ids, command, height=6, width=32):
+        """Constructor
+
+        Parameters:
+            master (tk.Frame | tk.Toplevel | tk.Tk): Tkinter parent widget
+            item_ids (list<str>): The ids of the items to list
+            command (callable): Called with the id of the chosen item
+            height (int): The number of items visible at once
+            width (int): The width of the list, in characters
+        """
+        super().__init__(master)
+
+        self._item_ids = list(item_ids)
+        self._command = command
+
+        self._title = tk.Label(self, text="Auto craft")
+        self._title.pack(side=tk.TOP)
+        self._list = tk.Listbox(self, height=height, width=width)
+        self._list.pack(side=tk.TOP, fill=tk.X)
+        self._button = tk.Button(self, text="Craft", command=self._craft_selected)
+        self._button.pack(side=tk.TOP)
+
+        for item_id in self._item_ids:
+            self._list.insert(tk.END, item_id)
+
+        self._list.bind("<Double-Button-1>", lambda e: self._craft_selected())
+
+    def _craft_selected(self):
+        """Crafts the selected item, if any"""
+        selection = self._list.curselection()
+
+        if selection:
+            self._command(self._item_ids[selection[0]])
+
+
 class CraftingWindow(tk.Toplevel):
     """Tkinter widget to manage a the three relevant widgets for a crafting window:
         crafter, inventory, and hotbar"""
 
-    def __init__(self, master, title, hot_bar: Grid, inventory: Grid, crafter: GridCrafter):
+    def __init__(self, master, title, hot_bar: Grid, inventory: Grid, crafter: GridCrafter, tracker=None,
+                 auto_craft=None):
         """Constructor
 
         Parameters:
@@ -296,10 +645,16 @@ class CraftingWindow(tk.Toplevel):
             hotbar (Grid): The hotbar to show at the bottom of the window
             inventory (Grid): The inventory to show above the hotbar, below the crafting widget
             crafter (GridCraft): The crafter that powers the crafting widget
+            tracker (CraftableTracker): If provided, the crafter's recipes that can be crafted
+                                        now are listed beside the crafting widget
+            auto_craft (tuple<list<str>, callable>): If provided, the ids of items that can be crafted
+                    automatically, listed beside the crafting widget, & a function that crafts the item
+                    with the given id (see AutoCraftView)
         """
         super().__init__(master)
 
         self.title(title)
+        self.protocol("WM_DELETE_WINDOW", self.hide)
 
         self._sources = {
             'hot_bar': hot_bar,
@@ -311,6 +666,16 @@ class CraftingWindow(tk.Toplevel):
 
         self._load_crafter_view()
 
+        self._tracker = tracker
+        if tracker is not None:
+            self._recipe_book_view = RecipeBookView(self)
+            self._recipe_book_view.pack()
+
+        if auto_craft is not None:
+            item_ids, craft = auto_craft
+            self._auto_craft_view = AutoCraftView(self, item_ids, lambda item_id: self._auto_craft(craft, item_id))
+            self._auto_craft_view.pack()
+
         self._selection = None
 
         for widget_key in ('inventory', 'hot_bar'):
@@ -333,13 +698,32 @@ class CraftingWindow(tk.Toplevel):
         crafter_view.bind_for_id("<Button-1>", lambda key, e: self._handle_left_click("crafter", key, e))
         crafter_view.bind_for_id("<Button-2>", lambda key, e: self._handle_right_click("crafter", key, e))
 
+    def show(self):
+        """Shows this window again after it has been hidden, bringing it to the front"""
+        self.redraw()
+        self.deiconify()
+        self.lift()
+
+    def hide(self):
+        """Hides this window, so that it can be reshown without being rebuilt"""
+        self._selection = None
+        self.withdraw()
+
     def redraw(self):
         """Redraws all widgets (i.e. crafter, inventory, & hotbar)"""
         selected_widget, selected_position = self._selection if self._selection else (None, None)
 
         for key, widget in self._sources.items():
             view_widget = self._source_views[key]
-            view_widget.render(widget.items(), selected_position if selected_widget == key else None)
+            view_widget.refresh(widget, selected_position if selected_widget == key else None)
+
+        if self._tracker is not None:
+            self._recipe_book_view.render(self._sources['crafter'].get_recipes(), self._tracker)
+
+    def _auto_craft(self, craft, item_id):
+        """Crafts 'item_id' automatically with 'craft', showing the changes to the hotbar & inventory"""
+        craft(item_id)
+        self.redraw()
 
     def get_source(self, widget, key):
         """(Stack) Returns the stack at the cell corresponding to 'key' in 'widget'"""
@@ -447,6 +831,8 @@ class CraftingWindow(tk.Toplevel):
 
         if selection == ('crafter', 'craft'):
             self._sources['crafter'].craft()
+        elif selection == ('crafter', 'craft_max'):
+            self._sources['crafter'].craft_max()
         else:
             self.move1(selection, get_modifiers(mouse_event.state))
 
@@ -464,7 +850,7 @@ class CraftingWindow(tk.Toplevel):
         print(f"Right clicked on {widget_key} @ {key}")
         selection = widget_key, key
 
-        if selection == ('crafter', 'craft'):
+        if selection in (('crafter', 'craft'), ('crafter', 'craft_max')):
             return
         else:
             self.move2(selection, get_modifiers(mouse_event.state))
@@ -0,0 +1,198 @@
+"""
+Plans the sequence of crafts needed to make an item, crafting intermediate items as required
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import math
+
+from recipe_book import get_requirements
+
+
+class MissingMaterialsError(Exception):
+    """Raised when an item can't be crafted from the available materials"""
+
+    def __init__(self, item_id, missing):
+        """Constructor
+
+        Parameters:
+            item_id (str): The id of the item that was to be crafted
+            missing (dict<str: int>): The quantity of each raw material that is missing
+        """
+        self.item_id = item_id
+        self.missing = missing
+
+        materials = ", ".join(f"{count} {material}" for material, count in sorted(missing.items()))
+        super().__init__(f"Can't craft {item_id!r}; missing {materials}")
+
+
+class CraftingPlanner:
+    """Plans crafting sequences over the dependency graph formed by a set of recipes
+
+    Each item is produced by whichever of its recipes needs the fewest raw materials per item.
+    These choices, and the order in which each item's dependencies must be crafted, are memoised,
+    so each plan only visits the items involved once, however deep the recipe tree.
+    """
+
+    def __init__(self, recipes, raw_materials=()):
+        """Constructor
+
+        Parameters:
+            recipes (iterable<tuple>): The recipes that can be used (see RecipeIndex.add)
+            raw_materials (iterable<str>): Ids of items that are never crafted, even if a recipe
+                                           produces them (i.e. items gathered from the world)
+        """
+        self._raw_materials = set(raw_materials)
+
+        self._producers = {}
+        self._requirements = {}
+
+        for recipe in recipes:
+            item_id = recipe[1].get_item().get_id()
+            self._producers.setdefault(item_id, []).append(recipe)
+            self._requirements[recipe] = get_requirements(recipe)
+
+        # item id -> (chosen recipe or None if raw, raw materials needed per item)
+        self._choices = {}
+        # item id -> item ids of its dependency graph, ordered such that items precede their ingredients
+        self._orders = {}
+
+    def get_craftable_ids(self):
+        """(list<str>) Returns the ids of the items that recipes produce, other than raw materials,
+        in the order of their first recipe"""
+        return [item_id for item_id in self._producers if item_id not in self._raw_materials]
+
+    def _choose(self, item_id):
+        """Chooses the recipe for 'item_id' that needs the fewest raw materials
+
+        Return:
+            tuple<tuple, float>: The chosen recipe, or None if item_id is raw, and the total
+                                 quantity of raw materials needed to produce one item_id
+        """
+        return self._search(item_id, frozenset())[0]
+
+    def _search(self, item_id, visiting):
+        """Chooses the recipe for 'item_id' (see _choose), avoiding recipes that would form a cycle
+
+        Parameters:
+            item_id (str): The id of the item to produce
+            visiting (frozenset<str>): Items currently being chosen, which would form a cycle
+
+        Return:
+            tuple<tuple<tuple, float>, bool>: The choice (see _choose), and True iff a recipe for item_id
+                                              or any of its ingredients was skipped to avoid a cycle
+        """
+        if item_id in self._choices:
+            return self._choices[item_id], False
+
+        best = None, 1
+        pruned = False
+
+        if item_id not in self._raw_materials:
+            visiting = visiting | {item_id}
+            best_cost = math.inf
+
+            for recipe in self._producers.get(item_id, ()):
+                requirements = self._requirements[recipe]
+
+                if any(ingredient in visiting for ingredient in requirements):
+                    pruned = True
+                    continue
+
+                cost = 0
+                for ingredient, count in requirements.items():
+                    (_, ingredient_cost), ingredient_pruned = self._search(ingredient, visiting)
+                    cost += count * ingredient_cost
+                    pruned = pruned or ingredient_pruned
+
+                cost /= recipe[1].get_quantity()
+
+                if cost < best_cost:
+                    best, best_cost = (recipe, cost), cost
+
+            if pruned and best[0] is None:
+                # every recipe would form a cycle, so item_id can't be produced from here
+                best = None, math.inf
+
+        # choices that had to avoid a cycle, here or in an ingredient, depend on where the search
+        # started, so aren't reused
+        if not pruned:
+            self._choices[item_id] = best
+
+        return best, pruned
+
+    def _get_order(self, item_id):
+        """(list<str>) Returns the ids of item_id & everything it is crafted from, with each item
+        preceding its ingredients"""
+        if item_id in self._orders:
+            return self._orders[item_id]
+
+        post_order = []
+        visited = set()
+
+        def visit(current):
+            visited.add(current)
+            recipe = self._choose(current)[0]
+
+            if recipe is not None:
+                for ingredient in self._requirements[recipe]:
+                    if ingredient not in visited:
+                        visit(ingredient)
+
+            post_order.append(current)
+
+        visit(item_id)
+
+        order = self._orders[item_id] = post_order[::-1]
+        return order
+
+    def plan(self, item_id, quantity=1, available=None):
+        """Plans the crafts needed to make 'quantity' of 'item_id' from 'available' materials
+
+        Available items are used before crafting more of them
+
+        Parameters:
+            item_id (str): The id of the item to make
+            quantity (int): The quantity of item_id to make
+            available (dict<str: int>): The quantity of each item available to craft with
+
+        Return:
+            list<tuple<tuple, int>>: (recipe, times) pairs, in the order they should be crafted
+
+        Raises:
+            KeyError: if no recipe produces item_id
+            MissingMaterialsError: if the available materials are insufficient, before any crafting is planned
+        """
+        if self._choose(item_id)[0] is None:
+            raise KeyError(f"No recipe produces {item_id!r}")
+
+        available = dict(available or {})
+        demand = {item_id: quantity + available.get(item_id, 0)}
+
+        steps = []
+        missing = {}
+
+        for current in self._get_order(item_id):
+            needed = demand.get(current, 0) - available.get(current, 0)
+
+            if needed <= 0:
+                continue
+
+            recipe = self._choose(current)[0]
+
+            if recipe is None:
+                missing[current] = needed
+                continue
+
+            times = math.ceil(needed / recipe[1].get_quantity())
+            steps.append((recipe, times))
+
+            for ingredient, count in self._requirements[recipe].items():
+                demand[ingredient] = demand.get(ingredient, 0) + count * times
+
+        if missing:
+            raise MissingMaterialsError(item_id, missing)
+
+        return steps[::-1]
@@ -1,5 +1,6 @@
 from physical_thing import DynamicThing
 from item import Item
+from grid import Stack
 
 __author__ = "Benjamin Martin and Paul Haley"
 __version__ = "1.1.0"
@@ -8,26 +9,50 @@ __copyright__ = "The University of Queensland, 2019"
 
 
 class DroppedItem(DynamicThing):
-    """A physical representation of an Item"""
+    """A physical representation of a stack of Items"""
 
-    def __init__(self, item: Item):
+    def __init__(self, item: Item, quantity: int = 1):
         """Constructor
 
         Parameters:
             item (Item): The conceptual item that this DroppedItem represents physically
+            quantity (int): The number of items represented, up to the item's maximum stack size
         """
         super().__init__()
 
-        self._item = item
+        self._stack = Stack(item, quantity)
 
     def get_item(self) -> Item:
         """(Item) Returns the conceptual Item this DroppedItem represents"""
-        return self._item
+        return self._stack.get_item()
+
+    def get_stack(self) -> Stack:
+        """(Stack) Returns the stack of items this DroppedItem represents"""
+        return self._stack
+
+    def get_quantity(self) -> int:
+        """(int) Returns the number of items this DroppedItem represents"""
+        return self._stack.get_quantity()
+
+    def can_merge(self, other: "DroppedItem") -> bool:
+        """(bool) Returns True iff all of other's items can be merged into this DroppedItem"""
+        return self._stack.matches(other._stack) and other.get_quantity() <= self._stack.get_space()
+
+    def merge(self, other: "DroppedItem") -> bool:
+        """Merges all of other's items into this DroppedItem, if possible (see can_merge)
+
+        Return:
+            bool: True iff other was merged, in which case it is left empty
+        """
+        if not self.can_merge(other):
+            return False
+
+        return self._stack.absorb(other._stack)
 
     # The following methods do not require documentation as their purpose is
     # obvious/defined in the super class
     def __repr__(self):
-        return f"{self.__class__.__name__}({self._item!r})"
+        return f"{self.__class__.__name__}({self.get_item()!r})"
 
     def use(self):
         pass
@@ -37,5 +62,3 @@ class DroppedItem(DynamicThing):
 
     def is_mineable(self):
         return False
-
-
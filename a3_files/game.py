@@ -38,6 +38,12 @@ class GameView(tk.Canvas):
 
         self._world_view_router = physical_view_router
 
+        # Canvas items of the target & cursor, created on the first call to show_target, then
+        # moved & hidden in place rather than recreated every frame
+        self._overlay = None
+        self._overlay_position = None
+        self._overlay_shown = False
+
     def show_target(self, player_position, target_position, cursor_position=None,
                     target_radius=14, target_thickness=2, crosshair_radius=4,
                     target_colour='purple', cursor_bg_colour='grey', cursor_fg_colour='white'):
@@ -53,6 +59,8 @@ class GameView(tk.Canvas):
 
         If 'cursor_position' is None, it will default to 'target_position'.
 
+        The target & cursor are only created once, so the thickness & colours of the first call are kept.
+
         Parameters:
             player_position (tuple<int, int>): The position of the player
             target_position (tuple<int, int>): The position of the target cell (i.e. the centre of the block)
@@ -72,30 +80,60 @@ class GameView(tk.Canvas):
         else:
             cx, cy = cursor_position
 
-        coords = x - target_radius, y - target_radius, x + target_radius, y + target_radius
-        self.create_rectangle(coords, fill='', width=target_thickness * 2, outline=target_colour,
-                              tag=('block', 'target'))
+        if self._overlay is None:
+            self._create_overlay(target_thickness, target_colour, cursor_bg_colour, cursor_fg_colour)
+
+        position = player_position, target_position, (cx, cy), target_radius, crosshair_radius
+
+        if position != self._overlay_position:
+            self._overlay_position = position
+
+            horizontal = cx - crosshair_radius, cy, cx + crosshair_radius, cy
+            vertical = cx, cy - crosshair_radius, cx, cy + crosshair_radius
 
-        if cursor_bg_colour:
-            self.create_line(player_position, (cx, cy), fill=cursor_bg_colour, tag='cursor', width=3)
+            coords = {
+                'target': (x - target_radius, y - target_radius, x + target_radius, y + target_radius),
+                'line': (*player_position, cx, cy),
+                'horizontal': horizontal,
+                'vertical': vertical,
+            }
 
-        if cursor_fg_colour:
-            self.create_line(player_position, (cx, cy), fill=cursor_fg_colour, tag='cursor')
+            for (part, _), item in self._overlay.items():
+                self.coords(item, *coords[part])
 
-        horizontal = (cx - crosshair_radius, cy), (cx + crosshair_radius, cy)
-        vertical = (cx, cy - crosshair_radius), (cx, cy + crosshair_radius)
+        if not self._overlay_shown:
+            self._overlay_shown = True
+            self.itemconfigure('overlay', state=tk.NORMAL)
 
-        if cursor_bg_colour:
-            self.create_line(horizontal, fill=cursor_bg_colour, tag='cursor', width=3)
-            self.create_line(vertical, fill=cursor_bg_colour, tag='cursor', width=3)
+    def _create_overlay(self, target_thickness, target_colour, cursor_bg_colour, cursor_fg_colour):
+        """Creates the (hidden) canvas items for the target & cursor
 
-        if cursor_fg_colour:
-            self.create_line(horizontal, fill=cursor_fg_colour, tag='cursor')
-            self.create_line(vertical, fill=cursor_fg_colour, tag='cursor')
+        See show_target for parameters"""
+        self._overlay = {}
+        hidden = tk.HIDDEN
+
+        self._overlay['target', None] = self.create_rectangle(0, 0, 0, 0, fill='', width=target_thickness * 2,
+                                                              outline=target_colour, state=hidden,
+                                                              tag=('overlay', 'target'))
+
+        # background items are created first, so that they are drawn beneath foreground items
+        for layer, colour, width in (('bg', cursor_bg_colour, 3), ('fg', cursor_fg_colour, 1)):
+            if not colour:
+                continue
+
+            for part in ('line', 'horizontal', 'vertical'):
+                self._overlay[part, layer] = self.create_line(0, 0, 0, 0, fill=colour, width=width, state=hidden,
+                                                              tag=('overlay', 'cursor'))
 
     def hide_target(self):
-        """Removes the target & cursor from the screen"""
-        self.delete('cursor', 'target')
+        """Hides the target & cursor"""
+        if self._overlay_shown:
+            self._overlay_shown = False
+            self.itemconfigure('overlay', state=tk.HIDDEN)
+
+    def clear_physical(self):
+        """Removes all physical things from the screen, leaving the target & cursor"""
+        self.delete('!overlay')
 
     def draw_physical(self, things: Iterable[PhysicalThing]):
         """Draws all physical things, according to their draw method (on the view router)
@@ -109,6 +147,8 @@ class GameView(tk.Canvas):
             # QUERY: cache these?
             items = self._world_view_router.route_and_call(thing, shape, self)
 
+        self.tag_raise('overlay')
+
 
 class WorldViewRouter(InstanceRouter):
     """
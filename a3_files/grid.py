@@ -36,6 +36,26 @@ class Stack(object):
         self._item = item
         self._quantity = quantity
 
+        self._watchers = []
+
+    def watch(self, callback):
+        """Registers a callback to be called whenever this stack's quantity changes
+
+        Parameters:
+            callback (function): Called as callback(stack, change), where change (int) is the
+                                 (signed) difference in quantity
+        """
+        self._watchers.append(callback)
+
+    def unwatch(self, callback):
+        """Removes a callback registered with watch"""
+        self._watchers.remove(callback)
+
+    def _notify(self, change):
+        """Calls each watcher with a change in quantity"""
+        for callback in list(self._watchers):
+            callback(self, change)
+
     def copy(self):
         """(Stack) Returns a copy of this stack"""
         return self.__class__(self.get_item(), self.get_quantity())
@@ -92,6 +112,10 @@ class Stack(object):
 
         to_add = min(self._quantity + quantity, self._item.get_max_stack_size()) - self._quantity
         self._quantity += to_add
+
+        if to_add:
+            self._notify(to_add)
+
         return to_add
 
     def subtract(self, quantity: int) -> int:
@@ -105,7 +129,12 @@ class Stack(object):
         size"""
 
         remainder = self._quantity - quantity
+        change = max(0, remainder) - self._quantity
         self._quantity = max(0, remainder)
+
+        if change:
+            self._notify(change)
+
         return abs(remainder) if remainder > 0 else 0
 
     def decrement(self):
@@ -186,6 +215,14 @@ class ItemGridView(tk.Canvas):
         for key in self._slots:
             self._slots[key] = self.create_oval(self.grid_to_xy_centre(key), self.grid_to_xy_centre(key))
 
+        # The (rectangle, text, sub_text) canvas items of each cell, which are updated in place
+        self._cells = {}
+
+        # The grid last refreshed, and its version & active position at that time
+        self._source = None
+        self._version = None
+        self._active = None
+
     def grid_to_xy_box(self, grid_position):
         """Returns the coordinates of the bounding box of the cell at 'grid_position'
 
@@ -254,13 +291,22 @@ class ItemGridView(tk.Canvas):
         centre = self.grid_to_xy_centre(grid_position)
         left, top, right, bottom = self.grid_to_xy_box(grid_position)
 
-        self.create_rectangle(box, fill=colour, tag='cell')
+        grid_position = tuple(grid_position)
+        if grid_position not in self._cells:
+            self._cells[grid_position] = (
+                self.create_rectangle(box, tag='cell'),
+                self.create_text(centre, font=self._major_font, tag='cell'),
+                self.create_text(right, bottom, font=self._minor_font, tag='cell')
+            )
+
+        rectangle, major_text, minor_text = self._cells[grid_position]
+
+        self.itemconfigure(rectangle, fill=colour)
+        self.itemconfigure(major_text, text=text)
 
         if stack:
             item = stack.get_item()
 
-            self.create_text(centre, text=text, font=self._major_font, tag='cell')
-
             if item.is_stackable():
                 sub_text = f"{len(stack)}"
                 x = right
@@ -270,7 +316,10 @@ class ItemGridView(tk.Canvas):
                 x = left
                 anchor = tk.SW
 
-            self.create_text(x, bottom, text=sub_text, anchor=anchor, font=self._minor_font, tag='cell')
+            self.coords(minor_text, x, bottom)
+            self.itemconfigure(minor_text, text=sub_text, anchor=anchor)
+        else:
+            self.itemconfigure(minor_text, text="")
 
     def bind_for_id(self, event, callback):
         """Binds to tkinter mouse event and also provides position of
@@ -300,10 +349,38 @@ class ItemGridView(tk.Canvas):
             items list<Stack>: items to be displayed in Hot Bar
             active_position (int): id of currently active cell
         """
-        self.delete(tk.ALL)
+        self._source = None
+
         for position, stack in items:
             self.draw_cell(position, stack, position == active_position)
 
+    def refresh(self, grid, active_position=None):
+        """Redraws only the cells of 'grid' that have changed since it was last refreshed, so
+        refreshing an unchanged grid costs nothing
+
+        Parameters:
+            grid (Grid): The grid to display
+            active_position (tuple<int, int>): The position of the currently active cell, or None
+        """
+        version = grid.get_version()
+
+        if grid is not self._source:
+            positions = set(grid.keys())
+        elif version == self._version and active_position == self._active:
+            return
+        else:
+            positions = set(grid.get_changed(self._version))
+
+            if active_position != self._active:
+                positions.update(position for position in (self._active, active_position) if position is not None)
+
+        for position in positions:
+            self.draw_cell(position, grid[position], position == active_position)
+
+        self._source = grid
+        self._version = version
+        self._active = active_position
+
 
 class Grid:
     """A 2d grid to hold items"""
@@ -315,6 +392,51 @@ class Grid:
             ] for i in range(rows)
         ]
 
+        # The callback watching the stack at each occupied position
+        self._watchers = {}
+        self._listeners = []
+
+        # Incremented on every change; _changes maps each changed position to the version it last changed at
+        self._version = 0
+        self._changes = {}
+
+    def touch(self, position):
+        """Marks the cell at 'position' as changed, so that views redraw it
+
+        Changes made through this grid or to its stacks' quantities are marked automatically, but
+        changes to an item itself (i.e. a tool's durability) are not"""
+        self._version += 1
+        self._changes[tuple(position)] = self._version
+
+    def get_version(self):
+        """(int) Returns a number that increases whenever a cell in this grid changes"""
+        return self._version
+
+    def get_changed(self, since):
+        """(list<tuple<int, int>>) Returns the positions of the cells that have changed after version 'since'"""
+        return [position for position, version in self._changes.items() if version > since]
+
+    def add_listener(self, callback):
+        """Registers a callback to be called whenever the quantity of an item in this grid changes,
+        either because a stack was set/removed or because a stack's quantity changed
+
+        Parameters:
+            callback (function): Called as callback(item_id, change), where change (int) is the
+                                 (signed) difference in the quantity of item_id (str)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, item_id, change):
+        """Calls each listener with a change in the quantity of item_id"""
+        if change:
+            for callback in self._listeners:
+                callback(item_id, change)
+
+    def _handle_stack_change(self, position, stack, change):
+        """Handles a change in quantity of the stack at position"""
+        self.touch(position)
+        self._notify(stack.get_item().get_id(), change)
+
     def __repr__(self):
         return json.dumps([[repr(stack) for stack in row] for row in self._items], indent=4)
 
@@ -353,8 +475,26 @@ class Grid:
             stack (Stack): The stack to set, or None
         """
         row, column = position
+        previous = self._items[row][column]
+
+        if previous is stack:
+            return
+
+        self.touch(position)
+
+        # Grids may hold other values (i.e. canvas ids in ItemGridView), which aren't watched
+        if isinstance(previous, Stack):
+            previous.unwatch(self._watchers.pop((row, column)))
+            self._notify(previous.get_item().get_id(), -previous.get_quantity())
+
         self._items[row][column] = stack
 
+        if isinstance(stack, Stack):
+            watcher = self._watchers[row, column] = \
+                lambda stack, change: self._handle_stack_change((row, column), stack, change)
+            stack.watch(watcher)
+            self._notify(stack.get_item().get_id(), stack.get_quantity())
+
     def __len__(self):
         """(int) Returns the total number of elements in this grid"""
         rows, columns = self.get_size()
@@ -445,6 +585,33 @@ class Grid:
             return stack
 
 
+    def remove_items(self, item_id, quantity):
+        """Removes up to 'quantity' of the item with 'item_id' from this grid, emptying any
+        cells that become depleted
+
+        Parameters:
+            item_id (str): The id of the item to remove
+            quantity (int): The maximum quantity to remove
+
+        Return:
+            int: The quantity that was removed"""
+        removed = 0
+
+        for position, stack in self.items():
+            if removed >= quantity:
+                break
+
+            if stack and stack.get_item().get_id() == item_id:
+                count = min(stack.get_quantity(), quantity - removed)
+                stack.subtract(count)
+                removed += count
+
+                if stack.is_empty():
+                    self[position] = None
+
+        return removed
+
+
 class SelectableGrid(Grid):
     """A grid that can have a single cell selected"""
 
@@ -8,12 +8,12 @@ __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
 
-import random
-import cmath
-
 from physical_thing import DynamicThing
+from mob_steering import random_walk
 
 MOB_DEFAULT_TEMPO = 40
+# The default time (in seconds) between each time a mob thinks (see Mob.think)
+MOB_DEFAULT_THINK_INTERVAL = .4
 
 BIRD_GRAVITY_FACTOR = 150
 BIRD_X_SCALE = 1.61803
@@ -26,7 +26,8 @@ class Mob(DynamicThing):
 
     Should not be instantiated directly"""
 
-    def __init__(self, mob_id, size, tempo=MOB_DEFAULT_TEMPO, max_health=20):
+    def __init__(self, mob_id, size, tempo=MOB_DEFAULT_TEMPO, max_health=20,
+                 think_interval=MOB_DEFAULT_THINK_INTERVAL):
         """Constructor
 
         Parameters:
@@ -39,14 +40,14 @@ class Mob(DynamicThing):
                       - further from zero means faster movement
                       - negative is reversed
             max_health (float): The maximum & starting health for this mob
+            think_interval (float): The time (in seconds) between each time this mob thinks
         """
         super().__init__(max_health=max_health)
 
         self._id = mob_id
         self._size = size
         self._tempo = tempo
-
-        self._steps = 0
+        self._think_interval = think_interval
 
     def get_id(self):
         """(str) Returns the unique id for this type of mob"""
@@ -56,41 +57,88 @@ class Mob(DynamicThing):
         """(str) Returns the physical (x, y) size of this mob"""
         return self._size
 
-    def step(self, time_delta, game_data):
-        """Advance this mob by one time step
+    def get_tempo(self):
+        """(float) Returns the movement tempo of this mob"""
+        return self._tempo
 
-        See PhysicalThing.step for parameters & return"""
-        # Track time via time_delta would be more precise, but a step counter is simpler
-        # and works reasonably well, assuming time steps occur at roughly constant time deltas
-        self._steps += 1
+    def get_random_walk(self):
+        """Returns how this mob moves when it thinks, if it wanders randomly (see mob_steering.random_walk)
 
-    def __repr__(self):
-        return f"{self.__class__.__name__}({self._id!r})"
+        Return:
+            tuple<float, float>: The (x_scale, gravity_factor) of this mob's random walk, or None if it doesn't wander
+        """
+        return None
 
+    def get_think_interval(self):
+        """(float) Returns the time (in seconds) between each time this mob thinks"""
+        return self._think_interval
 
-class Bird(Mob):
-    """A friendly bird, nonchalant with a dash of cheerfulness"""
+    def think(self, time_delta, game_data):
+        """Decides what this mob does next, i.e. where to move
 
-    def step(self, time_delta, game_data):
-        """Advance this bird by one time step
+        Called about once per think interval by the world's mob scheduler (see mob_scheduler.py),
+        which spreads the thinking of all mobs over time, whereas step is called every time step.
+        Anything that accumulates over time should use 'time_delta', since thinking can be deferred.
 
-        See PhysicalThing.step for parameters & return"""
-        # Every 20 steps; could track time_delta instead to be more precise
-        if self._steps % 20 == 0:
-            # a random point on a movement circle (radius=tempo), scaled by the percentage
-            # of health remaining
-            health_percentage = self._health / self._max_health
-            z = cmath.rect(self._tempo * health_percentage, random.uniform(0, 2 * cmath.pi))
+        Parameters:
+            time_delta (float): The time that has passed since this mob last thought, in seconds
+            game_data (app.GameData): Arbitrary data supplied by the app class
+        """
+        walk = self.get_random_walk()
+
+        if walk is not None:
+            random_walk([self], *walk, time_scales=[time_delta / self.get_think_interval()])
+
+    @classmethod
+    def think_all(cls, mobs, time_deltas, game_data):
+        """Lets many mobs of this class think at once
 
-            # stretch that random point onto an ellipse that is wider on the x-axis
-            dx, dy = z.real * BIRD_X_SCALE, z.imag
+        Mobs that only wander randomly are steered together in one batch; otherwise each mob thinks in turn
+
+        Parameters:
+            mobs (list<Mob>): The mobs that are to think, all instances of this class
+            time_deltas (list<float>): The time since each mob last thought (see think)
+            game_data (app.GameData): Arbitrary data supplied by the app class
+        """
+        if cls.think is not Mob.think:
+            for mob, time_delta in zip(mobs, time_deltas):
+                mob.think(time_delta, game_data)
+            return
 
-            x, y = self.get_velocity()
-            velocity = x + dx, y + dy - BIRD_GRAVITY_FACTOR
+        cls.wander_all(mobs, time_deltas)
+
+    @staticmethod
+    def wander_all(mobs, time_deltas):
+        """Steers the mobs that wander randomly (see get_random_walk), in one batch per kind of random walk
+
+        Parameters:
+            mobs (list<Mob>): The mobs to steer
+            time_deltas (list<float>): The time since each mob last thought (see think)
+        """
+        walks = {}
+        for mob, time_delta in zip(mobs, time_deltas):
+            walk = mob.get_random_walk()
+
+            if walk is not None:
+                walkers, time_scales = walks.setdefault(walk, ([], []))
+                walkers.append(mob)
+                time_scales.append(time_delta / mob.get_think_interval())
+
+        for (x_scale, gravity_factor), (walkers, time_scales) in walks.items():
+            random_walk(walkers, x_scale, gravity_factor, time_scales)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._id!r})"
+
+
+class Bird(Mob):
+    """A friendly bird, nonchalant with a dash of cheerfulness"""
 
-            self.set_velocity(velocity)
+    def get_random_walk(self):
+        """Flutters in a random direction, on an ellipse that is wider on the x-axis
 
-        super().step(time_delta, game_data)
+        See Mob.get_random_walk for return"""
+        return BIRD_X_SCALE, BIRD_GRAVITY_FACTOR
 
     def use(self):
         pass
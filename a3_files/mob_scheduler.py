@@ -0,0 +1,161 @@
+"""
+Spreads the AI updates of mobs across steps, within a budget per step
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import heapq
+import itertools
+import math
+import random
+
+# The most mobs that think in a single step
+MOB_THINK_BUDGET = 100
+# The number of think windows each mob's think interval is divided into; mobs think at the end of the
+# window they are due in, so a population thinks in this many batches per interval (see Mob.think_all),
+# each large enough to be steered in one vectorised pass (see mob_steering.random_walk)
+MOB_THINK_WINDOWS = 4
+
+
+class MobScheduler:
+    """Decides which mobs think (see Mob.think_all) on each step
+
+    Each mob thinks once per think interval, measured in elapsed time. Mobs start at a random
+    phase within their interval, so mobs created together don't all think on the same step.
+    Phases are rounded up to the end of a think window, a fraction of the interval, so the mobs
+    of each class that are due within a window think together, as one batch.
+    When more mobs are due than the budget allows, those nearest the focus (i.e. the player)
+    think first, while the rest are deferred to the next step, gaining priority the longer
+    they are overdue.
+    """
+
+    def __init__(self, budget=MOB_THINK_BUDGET, windows=MOB_THINK_WINDOWS):
+        """Constructor
+
+        Parameters:
+            budget (int): The most mobs that think per step, or None for no limit
+            windows (int): The number of think windows per think interval, or None for mobs to think
+                           exactly when they are due
+        """
+        self._budget = budget
+        self._windows = windows
+        self._time = 0
+
+        # heap of (time the mob is next due, tie breaker, mob)
+        self._queue = []
+        self._counter = itertools.count()
+        # mob -> the time it is next due; mobs absent here have been removed & are discarded from the queue
+        self._due = {}
+        # mob -> the time it last thought (or was added)
+        self._last_thought = {}
+
+        self._updated = 0
+        self._deferred = 0
+        self._total_deferred = 0
+
+    def add(self, mob):
+        """Schedules 'mob' to think, starting at a random point within its think interval"""
+        self._last_thought[mob] = self._time
+        self._push(mob, self._get_window_end(mob, self._time + random.uniform(0, mob.get_think_interval())))
+
+    def remove(self, mob):
+        """Stops scheduling 'mob'"""
+        self._due.pop(mob, None)
+        self._last_thought.pop(mob, None)
+
+    def _get_window_end(self, mob, time):
+        """(float) Returns the end of the think window of 'mob' that contains 'time'"""
+        if self._windows is None:
+            return time
+
+        window = mob.get_think_interval() / self._windows
+        # rounded, so floating point error can't push a time at the end of a window into the next
+        return math.ceil(round(time / window, 6)) * window
+
+    def _push(self, mob, due):
+        self._due[mob] = due
+        heapq.heappush(self._queue, (due, next(self._counter), mob))
+
+    def update(self, time_delta, game_data, focus=None):
+        """Advances time by 'time_delta' seconds & lets the mobs that are due think
+
+        Parameters:
+            time_delta (float): The time that has passed since the last update, in seconds
+            game_data (app.GameData): Arbitrary data to be passed on to each mob's think method
+            focus (tuple<float, float>): The (x, y) position around which mobs are prioritised, or None
+        """
+        self._time += time_delta
+        now = self._time
+
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due_time, _, mob = heapq.heappop(self._queue)
+
+            if self._due.get(mob) == due_time:
+                due.append((due_time, mob))
+
+        if self._budget is not None and len(due) > self._budget:
+            if focus is not None:
+                due.sort(key=lambda entry: self._get_priority(entry[1], entry[0], focus))
+
+            deferred = due[self._budget:]
+            due = due[:self._budget]
+
+            for due_time, mob in deferred:
+                heapq.heappush(self._queue, (due_time, next(self._counter), mob))
+        else:
+            deferred = ()
+
+        # mobs of the same class think together, so they can be steered in batches (see Mob.think_all)
+        by_class = {}
+        for _, mob in due:
+            mobs, time_deltas = by_class.setdefault(type(mob), ([], []))
+            mobs.append(mob)
+            time_deltas.append(now - self._last_thought[mob])
+            self._last_thought[mob] = now
+
+        for mob_class, (mobs, time_deltas) in by_class.items():
+            mob_class.think_all(mobs, time_deltas, game_data)
+
+        for due_time, mob in due:
+            # a mob may have been removed while thinking
+            if mob in self._due:
+                # due times follow on from the last, so mobs stay in their window rather than drifting
+                # a step later each time; mobs that fell behind (i.e. deferred) catch up from now
+                self._push(mob, self._get_window_end(mob, max(due_time, now - mob.get_think_interval())
+                                                     + mob.get_think_interval()))
+
+        self._updated = len(due)
+        self._deferred = len(deferred)
+        self._total_deferred += self._deferred
+
+    def _get_priority(self, mob, due_time, focus):
+        """(float) Returns the priority of a due mob, with lower values thinking first"""
+        x, y = mob.get_position()
+        distance = ((x - focus[0]) ** 2 + (y - focus[1]) ** 2) ** .5
+
+        # the longer a mob is overdue, the more its distance is discounted, so far mobs aren't starved
+        overdue = (self._time - due_time) / mob.get_think_interval()
+        return distance / (1 + overdue)
+
+    def get_stats(self):
+        """Returns statistics about the last update
+
+        Return:
+            dict<str: int>: The number of 'mobs' scheduled, the number that were 'updated' &
+                            'deferred' in the last update, & the 'total_deferred' over all updates
+        """
+        return {
+            'mobs': len(self._due),
+            'updated': self._updated,
+            'deferred': self._deferred,
+            'total_deferred': self._total_deferred,
+        }
+
+    def __contains__(self, mob):
+        return mob in self._due
+
+    def __len__(self):
+        return len(self._due)
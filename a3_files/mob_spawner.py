@@ -0,0 +1,178 @@
+"""
+Spawns mobs around the player & despawns them once they are far away, keeping the mob population bounded
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import math
+import random
+
+# The time (in seconds) between each spawning pass
+SPAWN_INTERVAL = .5
+# The most spawn attempts per pass
+SPAWN_BUDGET = 4
+# Mobs spawn between the minimum & maximum distance (in cells) from the player's column
+MIN_SPAWN_DISTANCE = 4
+MAX_SPAWN_DISTANCE = 16
+
+# The width (in columns) of each chunk, & the most mobs per chunk & in the whole world
+# Spawned mobs are despawned once they are in a chunk further from the player's chunk than any chunk
+# they could have spawned in, i.e. MAX_SPAWN_DISTANCE / CHUNK_SIZE chunks, rounded up
+CHUNK_SIZE = 8
+MAX_MOBS_PER_CHUNK = 4
+MAX_MOBS = 32
+
+
+class MobSpawner:
+    """A world system (see World.add_system) that spawns mobs on the surface near the player
+
+    The world is divided into chunks of columns. Each pass, a few random columns near the player
+    are tried; a mob spawns above the surface of the column (its topmost block) if its species can
+    live on that surface, unless the chunk or the world is full. Spawned mobs despawn once their
+    chunk is further from the player's than the spawn area reaches.
+    """
+
+    def __init__(self, interval=SPAWN_INTERVAL, budget=SPAWN_BUDGET, chunk_size=CHUNK_SIZE,
+                 max_per_chunk=MAX_MOBS_PER_CHUNK, max_mobs=MAX_MOBS, despawn_chunks=None):
+        """Constructor
+
+        Parameters:
+            interval (float): The time (in seconds) between each spawning pass
+            budget (int): The most spawn attempts per pass
+            chunk_size (int): The width (in columns) of each chunk
+            max_per_chunk (int): The most mobs in each chunk; no more spawn there beyond this
+            max_mobs (int): The most mobs in the world; no more spawn beyond this
+            despawn_chunks (int): The most chunks between a spawned mob's chunk & the player's before the mob
+                                  despawns; defaults to the furthest chunk mobs spawn in
+        """
+        self._interval = interval
+        self._budget = budget
+        self._chunk_size = chunk_size
+        self._max_per_chunk = max_per_chunk
+        self._max_mobs = max_mobs
+        if despawn_chunks is None:
+            despawn_chunks = math.ceil(MAX_SPAWN_DISTANCE / chunk_size)
+        self._despawn_chunks = despawn_chunks
+
+        # list of (factory, weight, surfaces, height)
+        self._species = []
+
+        # mobs spawned by this spawner, which are despawned when far away
+        self._spawned = set()
+        self._time_since_pass = 0
+
+        self._stats = {'spawned': 0, 'despawned': 0}
+
+    def add_species(self, factory, weight=1, surfaces=None, height=1):
+        """Adds a species of mob that can spawn
+
+        Parameters:
+            factory (callable): Creates a new mob of this species
+            weight (float): The relative likelihood of this species being chosen to spawn
+            surfaces (set<str>): Ids of the blocks this species can spawn on, or None for any block
+            height (int): The number of cells above the surface at which this species spawns
+        """
+        self._species.append((factory, weight, surfaces, height))
+
+    def update(self, world, time_delta, game_data):
+        """Despawns distant mobs & spawns new mobs, periodically
+
+        Parameters:
+            world (World): The world this system belongs to
+            time_delta (float): The time since the last update, in seconds
+            game_data (app.GameData): The data supplied to World.step
+        """
+        self._time_since_pass += time_delta
+        player = game_data.player if game_data is not None else None
+
+        if self._time_since_pass < self._interval or player is None or not self._species:
+            return
+
+        self._time_since_pass = 0
+
+        mobs = world.get_all_mobs()
+        player_x, player_y = player.get_position()
+        player_column = world.xy_to_grid(player_x, player_y)[0]
+        player_chunk = player_column // self._chunk_size
+
+        # mobs may have been removed by something else, i.e. killed
+        self._spawned.intersection_update(mobs)
+
+        for mob in list(self._spawned):
+            chunk = world.xy_to_grid(*mob.get_position())[0] // self._chunk_size
+
+            if abs(chunk - player_chunk) > self._despawn_chunks:
+                world.remove_mob(mob)
+                self._spawned.discard(mob)
+                mobs.remove(mob)
+                self._stats['despawned'] += 1
+
+        if len(mobs) >= self._max_mobs:
+            return
+
+        chunk_counts = {}
+        for mob in mobs:
+            chunk = world.xy_to_grid(*mob.get_position())[0] // self._chunk_size
+            chunk_counts[chunk] = chunk_counts.get(chunk, 0) + 1
+
+        columns, _ = world.get_grid_size()
+        weights = [weight for _, weight, _, _ in self._species]
+        population = len(mobs)
+
+        for _ in range(self._budget):
+            offset = random.randint(MIN_SPAWN_DISTANCE, MAX_SPAWN_DISTANCE) * random.choice((-1, 1))
+            column = player_column + offset
+
+            if not 0 <= column < columns:
+                continue
+
+            chunk = column // self._chunk_size
+            if chunk_counts.get(chunk, 0) >= self._max_per_chunk:
+                continue
+
+            factory, _, surfaces, height = random.choices(self._species, weights=weights)[0]
+
+            mob = self._spawn(world, column, factory, surfaces, height)
+            if mob is None:
+                continue
+
+            self._spawned.add(mob)
+            self._stats['spawned'] += 1
+            chunk_counts[chunk] = chunk_counts.get(chunk, 0) + 1
+            population += 1
+
+            if population >= self._max_mobs:
+                break
+
+    def _spawn(self, world, column, factory, surfaces, height):
+        """Spawns a mob above the surface of 'column', if the surface suits it
+
+        Return:
+            Mob: The mob that was spawned, or None if it couldn't spawn
+        """
+        _, rows = world.get_grid_size()
+
+        surface_row = 0
+        while surface_row < rows and world.get_block_at_cell(column, surface_row) is None:
+            surface_row += 1
+
+        if surface_row == rows:
+            return None
+
+        surface = world.get_block_at_cell(column, surface_row)
+        if surfaces is not None and surface.get_id() not in surfaces:
+            return None
+
+        row = surface_row - height
+        if row < 0:
+            return None
+
+        mob = factory()
+        world.add_mob(mob, *world.grid_to_xy_centre(column, row))
+        return mob
+
+    def get_stats(self):
+        """(dict<str: int>) Returns the number of mobs 'spawned' & 'despawned' by this spawner"""
+        return dict(self._stats)
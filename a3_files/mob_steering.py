@@ -0,0 +1,71 @@
+"""
+Steering behaviours applied to many mobs at once
+
+Uses numpy to steer large batches of mobs in one vectorised pass, if it is installed
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import cmath
+import itertools
+import math
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Batches smaller than this are steered one mob at a time, since numpy's overhead outweighs its speed
+NUMPY_MIN_BATCH = 32
+
+_random = numpy.random.default_rng() if numpy is not None else None
+
+
+def random_walk(mobs, x_scale, gravity_factor, time_scales=None):
+    """Pushes each mob in a random direction, against gravity
+
+    Each mob's velocity changes by a random point on a circle, with a radius of the mob's tempo
+    scaled by its percentage of health remaining, stretched horizontally by 'x_scale', minus
+    'gravity_factor' vertically
+
+    Velocities are read & written directly on the mobs' bodies, since crossing into pymunk
+    is the main cost of steering
+
+    Parameters:
+        mobs (list<Mob>): The mobs to steer
+        x_scale (float): The horizontal stretch of the movement circle
+        gravity_factor (float): The upwards change in velocity, to counter gravity over one think interval
+        time_scales (list<float>): The time since each mob last thought, as a multiple of its think
+                                   interval, which scales its gravity factor; defaults to 1 for every mob
+    """
+    if time_scales is None:
+        time_scales = [1] * len(mobs)
+
+    if numpy is None or len(mobs) < NUMPY_MIN_BATCH:
+        for mob, time_scale in zip(mobs, time_scales):
+            health_percentage = mob.get_health() / mob.get_max_health()
+            z = cmath.rect(mob.get_tempo() * health_percentage, random.uniform(0, 2 * cmath.pi))
+
+            body = mob.get_shape().body
+            velocity = body.velocity
+            body.velocity = velocity.x + z.real * x_scale, velocity.y + z.imag - gravity_factor * time_scale
+
+        return
+
+    count = len(mobs)
+    bodies = [mob.get_shape().body for mob in mobs]
+
+    radii = numpy.fromiter((mob.get_tempo() * mob.get_health() / mob.get_max_health() for mob in mobs),
+                           float, count)
+    angles = _random.uniform(0, 2 * math.pi, count)
+
+    velocities = numpy.fromiter(itertools.chain.from_iterable(body.velocity for body in bodies),
+                                float, 2 * count).reshape(count, 2)
+    velocities[:, 0] += radii * numpy.cos(angles) * x_scale
+    velocities[:, 1] += radii * numpy.sin(angles) - gravity_factor * numpy.asarray(time_scales, float)
+
+    for body, (x, y) in zip(bodies, velocities.tolist()):
+        body.velocity = x, y
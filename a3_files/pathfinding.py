@@ -0,0 +1,288 @@
+"""
+Finds paths through the block grid for mobs, caching paths until the blocks around them change
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import heapq
+import itertools
+import math
+from collections import OrderedDict
+
+# The most path searches run per step; further requests wait for the next step
+PATHFINDING_BUDGET = 4
+# The shortest time (in seconds) between path requests from the same requester
+PATH_REQUEST_INTERVAL = .5
+# The width/height (in cells) of the regions by which cached paths are invalidated
+PATH_REGION_SIZE = 8
+# The most cells a search expands before giving up
+MAX_SEARCH_CELLS = 2000
+# The most paths cached; beyond that, the oldest are forgotten
+MAX_CACHED_PATHS = 1024
+
+# Costs of moves on the ground (other than walking to a neighbouring cell, which costs 1)
+JUMP_COST = 1.5
+FALL_COST = .5
+
+
+class PathFinder:
+    """Finds paths between grid cells with A* search, & caches them by (start, goal)
+
+    Cells are either solid (i.e. contain a block) or empty. Flying paths move between any
+    empty cells, including diagonally. Ground paths move between cells that can be stood
+    in (empty, with something solid beneath), by walking beside, jumping up one cell, or falling.
+
+    Each cached path remembers the regions of every cell its search looked at (i.e. checked
+    was solid), so changing a block only forgets the paths that could have been affected.
+    """
+
+    def __init__(self, is_solid, grid_size, region_size=PATH_REGION_SIZE, budget=PATHFINDING_BUDGET,
+                 request_interval=PATH_REQUEST_INTERVAL):
+        """Constructor
+
+        Parameters:
+            is_solid (callable): Returns True iff the cell at (column, row) is solid
+            grid_size (tuple<int, int>): The (column, row) size of the grid
+            region_size (int): The width/height (in cells) of the regions by which paths are invalidated
+            budget (int): The most requested searches run per update
+            request_interval (float): The shortest time (in seconds) between requests from the same requester
+        """
+        self._is_solid = is_solid
+        self._columns, self._rows = grid_size
+        self._region_size = region_size
+        self._budget = budget
+        self._request_interval = request_interval
+
+        # (start, goal, flying) -> path (or None if there is no path)
+        self._cache = {}
+        # region -> keys of cached paths whose search looked at that region
+        self._keys_by_region = {}
+
+        # requester -> (start, goal, flying, callback), oldest first
+        self._pending = OrderedDict()
+        # requester -> the time of its last request
+        self._last_requests = {}
+        self._time = 0
+
+        self._stats = {'hits': 0, 'searches': 0, 'invalidated': 0}
+
+    def _solid(self, column, row):
+        """(bool) Returns True iff the cell is solid, treating cells outside the grid as solid"""
+        if not (0 <= column < self._columns and 0 <= row < self._rows):
+            return True
+
+        return self._is_solid(column, row)
+
+    def get_standable(self, column, row):
+        """Returns the cell nearest to ('column', 'row') in its column that can be stood in
+
+        Falls from an empty cell, or climbs out of a solid cell
+
+        Return:
+            tuple<int, int>: The (column, row) position of the cell, or None if there isn't one
+        """
+        if not 0 <= column < self._columns:
+            return None
+
+        row = max(0, min(row, self._rows - 1))
+
+        while row >= 0 and self._solid(column, row):
+            row -= 1
+
+        if row < 0:
+            return None
+
+        while not self._solid(column, row + 1):
+            row += 1
+
+        return column, row
+
+    def _get_ground_moves(self, cell, solid):
+        """Yields each (cell, cost) move from a cell on the ground, checking cells with 'solid' (see _solid)"""
+        column, row = cell
+
+        for dx in (-1, 1):
+            next_column = column + dx
+
+            if not solid(next_column, row):
+                # walk across, then fall until landing
+                next_row = row
+                while not solid(next_column, next_row + 1):
+                    next_row += 1
+
+                yield (next_column, next_row), 1 + (next_row - row) * FALL_COST
+
+            elif not solid(column, row - 1) and not solid(next_column, row - 1):
+                yield (next_column, row - 1), JUMP_COST
+
+    def _get_flying_moves(self, cell, solid):
+        """Yields each (cell, cost) move from a cell in the air, checking cells with 'solid' (see _solid)"""
+        column, row = cell
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if not (dx or dy) or solid(column + dx, row + dy):
+                    continue
+
+                # don't cut corners
+                if dx and dy and (solid(column + dx, row) or solid(column, row + dy)):
+                    continue
+
+                yield (column + dx, row + dy), math.sqrt(2) if dx and dy else 1
+
+    def _get_region(self, cell):
+        return cell[0] // self._region_size, cell[1] // self._region_size
+
+    def find_path(self, start, goal, flying=False):
+        """Finds the cheapest path between two cells, from the cache if possible
+
+        Parameters:
+            start (tuple<int, int>): The (column, row) cell to start from
+            goal (tuple<int, int>): The (column, row) cell to reach
+            flying (bool): True iff the path can move through the air, otherwise it must follow the ground
+
+        Return:
+            list<tuple<int, int>>: The cells to move through after start, ending with goal, or None if there
+                                   is no path
+        """
+        key = start, goal, flying
+
+        if key in self._cache:
+            self._stats['hits'] += 1
+            return self._cache[key]
+
+        path, regions = self._search(start, goal, flying)
+        self._stats['searches'] += 1
+
+        self._cache[key] = path
+        if len(self._cache) > MAX_CACHED_PATHS:
+            # regions may still refer to the forgotten path, which is harmless
+            del self._cache[next(iter(self._cache))]
+
+        for region in regions:
+            self._keys_by_region.setdefault(region, set()).add(key)
+
+        return path
+
+    def _search(self, start, goal, flying):
+        """Runs an A* search from start to goal
+
+        Return:
+            tuple<list, set>: The path (see find_path) & the regions of the cells the search looked at
+        """
+        get_moves = self._get_flying_moves if flying else self._get_ground_moves
+        is_solid = self._solid
+        region_size = self._region_size
+
+        goal_column, goal_row = goal
+
+        if flying:
+            def heuristic(cell):
+                dx, dy = abs(cell[0] - goal_column), abs(cell[1] - goal_row)
+                return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+        else:
+            def heuristic(cell):
+                # every ground move changes column by exactly one, for a cost of at least one
+                return abs(cell[0] - goal_column)
+
+        regions = {self._get_region(start), self._get_region(goal)}
+
+        # every cell checked is recorded, including those fallen through & the headroom of jumps,
+        # since a block placed or mined there changes the moves available
+        def solid(column, row):
+            regions.add((column // region_size, row // region_size))
+            return is_solid(column, row)
+
+        if not flying and (solid(*goal) or not solid(goal_column, goal_row + 1)):
+            return None, regions
+
+        counter = itertools.count()
+        queue = [(heuristic(start), next(counter), start)]
+        costs = {start: 0}
+        previous = {}
+        expanded = 0
+
+        while queue and expanded < MAX_SEARCH_CELLS:
+            _, _, cell = heapq.heappop(queue)
+
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = previous[cell]
+                return path[::-1], regions
+
+            expanded += 1
+            cost = costs[cell]
+
+            for next_cell, move_cost in get_moves(cell, solid):
+                next_cost = cost + move_cost
+
+                if next_cost < costs.get(next_cell, math.inf):
+                    costs[next_cell] = next_cost
+                    previous[next_cell] = cell
+                    heapq.heappush(queue, (next_cost + heuristic(next_cell), next(counter), next_cell))
+
+        return None, regions
+
+    def invalidate(self, cell):
+        """Forgets the cached paths whose search looked at the region containing 'cell', i.e. after the
+        cell's block changes"""
+        for key in self._keys_by_region.pop(self._get_region(cell), ()):
+            if self._cache.pop(key, False) is not False:
+                self._stats['invalidated'] += 1
+
+    def request(self, requester, start, goal, callback, flying=False):
+        """Requests a path, answered immediately if cached, otherwise by a later update
+
+        Requests from the same requester within the request interval are ignored, & a new request
+        replaces the requester's pending request
+
+        Parameters:
+            requester (object): The (hashable) thing requesting the path, i.e. a mob
+            callback (callable): Called with the path (see find_path) once it has been found
+
+            - See find_path for other parameters
+
+        Return:
+            bool: True iff the request was answered or queued
+        """
+        key = start, goal, flying
+
+        if key in self._cache:
+            self._stats['hits'] += 1
+            callback(self._cache[key])
+            return True
+
+        last_request = self._last_requests.get(requester)
+        if last_request is not None and self._time - last_request < self._request_interval:
+            return False
+
+        self._last_requests[requester] = self._time
+        self._pending.pop(requester, None)
+        self._pending[requester] = start, goal, flying, callback
+        return True
+
+    def forget(self, requester):
+        """Drops any pending request from 'requester'"""
+        self._pending.pop(requester, None)
+        self._last_requests.pop(requester, None)
+
+    def update(self, time_delta):
+        """Advances time by 'time_delta' seconds, & answers the oldest pending requests, within the budget"""
+        self._time += time_delta
+
+        for _ in range(min(self._budget, len(self._pending))):
+            _, (start, goal, flying, callback) = self._pending.popitem(last=False)
+            callback(self.find_path(start, goal, flying))
+
+    def get_stats(self):
+        """Returns statistics about path finding
+
+        Return:
+            dict<str: int>: The number of 'cached' paths, 'pending' requests, cache 'hits', 'searches' run,
+                            & cached paths 'invalidated' by block changes
+        """
+        return dict(self._stats, cached=len(self._cache), pending=len(self._pending))
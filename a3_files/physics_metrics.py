@@ -0,0 +1,80 @@
+"""
+Periodically exports statistics about the physics simulation to a metrics file, for dashboards
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import json
+import time
+
+# The time (in seconds) between each line written to the metrics file
+METRICS_INTERVAL = 5
+
+
+class PhysicsMetricsWriter:
+    """A world system (see World.add_system) that appends the world's physics statistics to a file
+
+    Each line of the file is a JSON object, holding the latest statistics (see World.get_physics_stats)
+    along with the wall clock 'timestamp', the number of 'steps' since the previous line, & the
+    'mean_step_time' & 'max_step_time' of the physics space over those steps.
+    """
+
+    def __init__(self, path, interval=METRICS_INTERVAL):
+        """Constructor
+
+        Parameters:
+            path (str): The path of the metrics file, which is appended to
+            interval (float): The time (in seconds) between each line written
+        """
+        self._path = path
+        self._interval = interval
+
+        self._time_since_write = 0
+        self._steps = 0
+        self._total_step_time = 0
+        self._max_step_time = 0
+
+    def update(self, world, time_delta, game_data):
+        """Records the world's last physics step, & writes a line to the metrics file periodically
+
+        The physics space steps after systems update, so each update records the step before it
+
+        Parameters:
+            world (World): The world this system belongs to
+            time_delta (float): The time since the last update, in seconds
+            game_data (app.GameData): The data supplied to World.step
+        """
+        step_time = world.get_last_step_time()
+
+        if step_time is not None:
+            self._steps += 1
+            self._total_step_time += step_time
+            self._max_step_time = max(self._max_step_time, step_time)
+
+        self._time_since_write += time_delta
+        if self._time_since_write < self._interval:
+            return
+
+        self._time_since_write = 0
+        self.write(dict(world.get_physics_stats(), contact_pairs=world.get_contact_pair_counts()))
+
+    def write(self, stats):
+        """Appends a line holding 'stats' & the step times since the last line to the metrics file
+
+        Parameters:
+            stats (dict): The statistics to write (see World.get_physics_stats)
+        """
+        line = dict(stats,
+                    timestamp=time.time(),
+                    steps=self._steps,
+                    mean_step_time=self._total_step_time / self._steps if self._steps else 0,
+                    max_step_time=self._max_step_time)
+
+        with open(self._path, 'a') as file:
+            file.write(json.dumps(line) + "\n")
+
+        self._steps = 0
+        self._total_step_time = 0
+        self._max_step_time = 0
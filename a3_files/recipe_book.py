@@ -0,0 +1,216 @@
+"""
+Loads crafting recipes from a data file & compiles them once into recipe indexes
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import json
+import os
+from collections import Counter
+
+from grid import Stack
+from crafting import RecipeIndex, shapeless_key
+
+# Default recipe data file, see load method of RecipeBook for its format
+RECIPES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipes.json")
+
+
+class RecipeBook:
+    """A collection of compiled recipe indexes, one for each type of crafting (i.e. 'basic')
+
+    Recipes are compiled once, so crafters can share the same index for the lifetime of the game
+    """
+
+    def __init__(self, item_factory):
+        """Constructor
+
+        Parameters:
+            item_factory (callable): Creates an item from its id parts, i.e. create_item in app.py
+        """
+        self._item_factory = item_factory
+        self._indexes = {}
+
+    def load(self, filename=RECIPES_FILE):
+        """Loads & compiles all recipes from a json data file
+
+        The file maps each craft type to its grid size & recipes, i.e.
+            {
+                "basic": {
+                    "size": [2, 2],
+                    "recipes": [
+                        {"pattern": [[null, "wood"], [null, "wood"]], "result": ["stick"], "quantity": 4},
+                        {"ingredients": ["wood", "wool"], "shapeless": true, "result": ["bed"]},
+                        ...
+                    ]
+                },
+                ...
+            }
+
+        Parameters:
+            filename (str): The path of the recipe data file
+
+        Raises:
+            ValueError: if any recipe is invalid
+        """
+        with open(filename) as file:
+            data = json.load(file)
+
+        for craft_type, book in data.items():
+            self.compile(craft_type, book["size"], book["recipes"])
+
+    def compile(self, craft_type, size, recipes):
+        """Compiles recipes for a type of crafting, replacing any existing recipes for that type
+
+        Parameters:
+            craft_type (str): The type of crafting (i.e. 'basic', 'crafting_table')
+            size (tuple<int, int>): The (row, column) size of the crafting input
+            recipes (list<dict>): The recipe entries, as described in load
+
+        Raises:
+            ValueError: if any recipe is invalid
+        """
+        rows, columns = size
+        index = RecipeIndex(rows, columns)
+
+        for i, entry in enumerate(recipes):
+            try:
+                index.add(self._compile_recipe(entry, rows, columns))
+            except (KeyError, TypeError, ValueError) as error:
+                raise ValueError(f"Invalid {craft_type!r} recipe #{i}: {error}") from error
+
+        self._indexes[craft_type] = index
+
+    def _compile_recipe(self, entry, rows, columns):
+        """Compiles a single recipe entry into a recipe tuple (see RecipeIndex.add)"""
+        item = self._item_factory(*entry["result"])
+        quantity = entry.get("quantity", 1)
+
+        if not 0 < quantity <= item.get_max_stack_size():
+            raise ValueError(f"quantity of {quantity} for {item.get_id()!r} must be between "
+                             f"1 and {item.get_max_stack_size()}")
+
+        result = Stack(item, quantity)
+
+        if entry.get("shapeless"):
+            return tuple(entry["ingredients"]), result, True
+
+        pattern = tuple(tuple(row) for row in entry["pattern"])
+
+        if len(pattern) > rows or any(len(row) != len(pattern[0]) or len(row) > columns for row in pattern):
+            raise ValueError(f"pattern must be rectangular and at most {rows}x{columns}, got {entry['pattern']}")
+
+        return pattern, result
+
+    def get_index(self, craft_type) -> RecipeIndex:
+        """(RecipeIndex) Returns the compiled recipes for 'craft_type'
+
+        Raises:
+            KeyError: if there are no recipes for 'craft_type'
+        """
+        if craft_type not in self._indexes:
+            raise KeyError(f"No recipes defined for {craft_type!r} crafting")
+
+        return self._indexes[craft_type]
+
+    def get_craft_types(self):
+        """(list<str>) Returns all types of crafting that have recipes"""
+        return list(self._indexes)
+
+
+def get_requirements(recipe):
+    """(Counter<str: int>) Returns the quantity of each item id consumed by crafting 'recipe' once"""
+    return Counter(shapeless_key(recipe[0]))
+
+
+class CraftableTracker:
+    """Tracks which recipes can currently be crafted from the contents of some grids, and how many times
+
+    Item counts are maintained incrementally from the grids' change notifications (see
+    Grid.add_listener), and only the recipes that use a changed item are re-evaluated
+    """
+
+    def __init__(self, recipes, grids):
+        """Constructor
+
+        Parameters:
+            recipes (iterable<tuple>): The recipes to track (i.e. a RecipeIndex)
+            grids (iterable<Grid>): The grids whose contents can be crafted with (i.e. hotbar & inventory)
+        """
+        self._recipes = []
+        self._requirements = {}
+        self._recipes_by_id = {}
+
+        self._counts = Counter()
+        self._craftable = {}
+        self._changed_ids = set()
+        self._dirty_recipes = set()
+        self._version = 0
+
+        for recipe in recipes:
+            self.add_recipe(recipe)
+
+        for grid in grids:
+            for stack in grid.values():
+                if stack:
+                    self._handle_change(stack.get_item().get_id(), stack.get_quantity())
+
+            grid.add_listener(self._handle_change)
+
+    def add_recipe(self, recipe):
+        """Starts tracking 'recipe'"""
+        requirements = self._requirements[recipe] = get_requirements(recipe)
+        self._recipes.append(recipe)
+        self._dirty_recipes.add(recipe)
+
+        for item_id in requirements:
+            self._recipes_by_id.setdefault(item_id, []).append(recipe)
+
+    def _handle_change(self, item_id, change):
+        """Records a change in the quantity of an item"""
+        self._counts[item_id] += change
+        self._changed_ids.add(item_id)
+
+    def _update(self):
+        """Re-evaluates the recipes that use any item that has changed since the last update"""
+        recipes = self._dirty_recipes
+        self._dirty_recipes = set()
+
+        for item_id in self._changed_ids:
+            recipes.update(self._recipes_by_id.get(item_id, ()))
+        self._changed_ids.clear()
+
+        for recipe in recipes:
+            times = min(self._counts[item_id] // count for item_id, count in self._requirements[recipe].items())
+
+            if times != self._craftable.get(recipe, 0):
+                self._version += 1
+
+                if times > 0:
+                    self._craftable[recipe] = times
+                else:
+                    del self._craftable[recipe]
+
+    def get_count(self, item_id):
+        """(int) Returns the total quantity of 'item_id' in the tracked grids"""
+        return self._counts[item_id]
+
+    def get_counts(self):
+        """(dict<str: int>) Returns the total quantity of each item in the tracked grids"""
+        return {item_id: count for item_id, count in self._counts.items() if count > 0}
+
+    def get_craftable(self):
+        """(dict<tuple: int>) Returns a mapping of each recipe that can be crafted now, to the number
+        of times it can be crafted"""
+        self._update()
+        return self._craftable
+
+    def get_times(self, recipe):
+        """(int) Returns the number of times 'recipe' can be crafted now"""
+        return self.get_craftable().get(recipe, 0)
+
+    def get_version(self):
+        """(int) Returns a number that changes whenever the craftable recipes change"""
+        self._update()
+        return self._version
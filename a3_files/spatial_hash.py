@@ -0,0 +1,88 @@
+"""
+A uniform grid of buckets for finding things near a point without checking every thing
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+
+class SpatialHash:
+    """Buckets things by the cell of a uniform grid that their position falls in
+
+    Finding the things near a point only checks the buckets of the cells around it, so is
+    independent of the total number of things when they are spread out
+    """
+
+    def __init__(self, cell_size):
+        """Constructor
+
+        Parameters:
+            cell_size (float): The width/height of each cell, ideally about the query distance
+        """
+        self._cell_size = cell_size
+
+        # (column, row) cell -> {thing: (x, y) position}
+        self._buckets = {}
+        # thing -> its (column, row) cell
+        self._cells = {}
+
+    def _get_cell(self, x, y):
+        """(tuple<int, int>) Returns the (column, row) cell containing the point ('x', 'y')"""
+        return int(x // self._cell_size), int(y // self._cell_size)
+
+    def add(self, thing, x, y):
+        """Adds 'thing' at the point ('x', 'y'), moving it if it has already been added"""
+        cell = self._get_cell(x, y)
+        old_cell = self._cells.get(thing)
+
+        if old_cell is not None and old_cell != cell:
+            self.remove(thing)
+
+        self._cells[thing] = cell
+        self._buckets.setdefault(cell, {})[thing] = x, y
+
+    def remove(self, thing):
+        """Removes 'thing', if it has been added"""
+        cell = self._cells.pop(thing, None)
+
+        if cell is None:
+            return
+
+        bucket = self._buckets[cell]
+        del bucket[thing]
+
+        if not bucket:
+            del self._buckets[cell]
+
+    def clear(self):
+        """Removes all things"""
+        self._buckets.clear()
+        self._cells.clear()
+
+    def get_nearby(self, x, y, distance):
+        """Yields every thing within 'distance' of the point ('x', 'y')
+
+        Yield:
+            tuple<thing, tuple<float, float>>: Each thing & its (x, y) position
+        """
+        min_column, min_row = self._get_cell(x - distance, y - distance)
+        max_column, max_row = self._get_cell(x + distance, y + distance)
+        square_distance = distance ** 2
+
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                bucket = self._buckets.get((column, row))
+
+                if not bucket:
+                    continue
+
+                for thing, (thing_x, thing_y) in bucket.items():
+                    if (thing_x - x) ** 2 + (thing_y - y) ** 2 <= square_distance:
+                        yield thing, (thing_x, thing_y)
+
+    def __contains__(self, thing):
+        return thing in self._cells
+
+    def __len__(self):
+        return len(self._cells)
@@ -0,0 +1,38 @@
+"""
+Tests for crafting tools, which each carry their own durability so must never share a stack
+"""
+
+from app import ToolItem, create_item
+from crafting import GridCrafter
+from grid import Stack
+
+PICKAXE_RECIPE = (
+    (("stone", "stone"),
+     (None, None)),
+    Stack(ToolItem("stone_pickaxe", "pickaxe", 132), 1),
+)
+
+
+def create_crafter(stone=5):
+    crafter = GridCrafter([PICKAXE_RECIPE])
+    crafter[0, 0] = Stack(create_item("stone"), stone)
+    crafter[0, 1] = Stack(create_item("stone"), stone)
+    return crafter
+
+
+def test_craft_max_crafts_one_tool():
+    crafter = create_crafter()
+
+    assert crafter.craft_max() == 1
+
+    output = crafter["output"]
+    assert output.get_quantity() == 1
+    assert output.get_item() is not PICKAXE_RECIPE[1].get_item()
+
+
+def test_craft_max_keeps_tools_in_separate_stacks():
+    crafter = create_crafter()
+    crafter.craft_max()
+
+    assert crafter.craft_max() == 0
+    assert crafter["output"].get_quantity() == 1
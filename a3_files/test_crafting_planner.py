@@ -0,0 +1,67 @@
+"""
+Tests for the crafting planner, which must craft intermediate items, report missing raw materials,
+and never plan a cycle of recipes
+"""
+
+import pytest
+
+from crafting_planner import CraftingPlanner, MissingMaterialsError
+from grid import Stack
+from item import Item
+
+RAW_MATERIALS = {"wood", "stone", "dirt"}
+
+
+def recipe(ingredients, result, quantity=1):
+    """Returns a recipe that crafts 'quantity' of 'result' from a single row of 'ingredients'"""
+    return (tuple(ingredients),), Stack(Item(result), quantity)
+
+
+STICK_RECIPE = recipe(["wood", "wood"], "stick", 4)
+PICKAXE_RECIPE = recipe(["stone", "stone", "stone", "stick", "stick"], "pickaxe")
+
+
+def test_plan_crafts_intermediate_items_first():
+    planner = CraftingPlanner([PICKAXE_RECIPE, STICK_RECIPE], RAW_MATERIALS)
+
+    assert planner.plan("pickaxe", 1, {"stone": 3, "wood": 2}) == [(STICK_RECIPE, 1), (PICKAXE_RECIPE, 1)]
+
+
+def test_plan_uses_available_intermediate_items():
+    planner = CraftingPlanner([PICKAXE_RECIPE, STICK_RECIPE], RAW_MATERIALS)
+
+    assert planner.plan("pickaxe", 1, {"stone": 3, "stick": 2}) == [(PICKAXE_RECIPE, 1)]
+
+
+def test_missing_materials_are_reported_exactly():
+    planner = CraftingPlanner([PICKAXE_RECIPE, STICK_RECIPE], RAW_MATERIALS)
+
+    with pytest.raises(MissingMaterialsError) as error:
+        planner.plan("pickaxe", 2, {"stone": 4, "wood": 1})
+
+    assert error.value.missing == {"stone": 2, "wood": 1}
+
+
+def test_cycle_is_avoided_for_a_recipe_from_raw_materials():
+    # a & b can each be crafted from the other, but b can also be crafted from dirt
+    a_from_b = recipe(["b"], "a")
+    b_from_a = recipe(["a"], "b")
+    b_from_dirt = recipe(["dirt", "dirt"], "b")
+    planner = CraftingPlanner([b_from_a, a_from_b, b_from_dirt], RAW_MATERIALS)
+
+    assert planner.plan("b", 1, {"dirt": 2}) == [(b_from_dirt, 1)]
+    assert planner.plan("a", 1, {"dirt": 2}) == [(b_from_dirt, 1), (a_from_b, 1)]
+
+
+def test_item_only_crafted_in_a_cycle_has_no_plan():
+    planner = CraftingPlanner([recipe(["b"], "a"), recipe(["a"], "b")], RAW_MATERIALS)
+
+    with pytest.raises(KeyError):
+        planner.plan("a", 1, {"a": 0, "b": 0})
+
+
+def test_unknown_item_has_no_plan():
+    planner = CraftingPlanner([STICK_RECIPE], RAW_MATERIALS)
+
+    with pytest.raises(KeyError):
+        planner.plan("pickaxe")
@@ -0,0 +1,63 @@
+"""
+Tests for the path finder's cache, which must forget paths when a block they depend on changes
+"""
+
+from pathfinding import PathFinder
+
+GRID_SIZE = 16, 16
+
+
+def create_pathfinder(solid, region_size=4):
+    """Returns a path finder over the cells in 'solid', with a floor along the bottom row"""
+    columns, rows = GRID_SIZE
+    solid.update((column, rows - 1) for column in range(columns))
+
+    return PathFinder(lambda column, row: (column, row) in solid, GRID_SIZE, region_size=region_size)
+
+
+def test_cached_path_is_reused():
+    pathfinder = create_pathfinder(set())
+
+    path = pathfinder.find_path((0, 14), (5, 14))
+
+    assert path == [(column, 14) for column in range(1, 6)]
+    assert pathfinder.find_path((0, 14), (5, 14)) is path
+    assert pathfinder.get_stats()['searches'] == 1
+
+
+def test_placing_block_in_fall_invalidates_path():
+    # a ledge along the top, to fall from
+    solid = {(column, 2) for column in range(9)}
+    pathfinder = create_pathfinder(solid)
+
+    assert pathfinder.find_path((8, 1), (12, 14))[0] == (9, 14)
+
+    # a block in the middle of the fall, far from the cells at either end of it
+    solid.add((9, 9))
+    pathfinder.invalidate((9, 9))
+
+    assert pathfinder.find_path((8, 1), (12, 14))[0] == (9, 8)
+
+
+def test_placing_block_in_headroom_invalidates_path():
+    # a step up to the left, to jump onto
+    solid = {(4, 13), (3, 12)}
+    pathfinder = create_pathfinder(solid)
+
+    assert pathfinder.find_path((4, 12), (3, 11)) == [(3, 11)]
+
+    # a block above the jump, in a region away from either end of it
+    solid.add((4, 11))
+    pathfinder.invalidate((4, 11))
+
+    assert pathfinder.find_path((4, 12), (3, 11)) is None
+
+
+def test_distant_block_keeps_path():
+    pathfinder = create_pathfinder(set())
+    pathfinder.find_path((0, 14), (3, 14))
+
+    pathfinder.invalidate((12, 2))
+
+    assert pathfinder.get_stats()['invalidated'] == 0
+    assert pathfinder.get_stats()['cached'] == 1
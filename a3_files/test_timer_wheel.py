@@ -0,0 +1,75 @@
+"""
+Tests for the timer wheel, whose timers must expire on time wherever they are held in the wheel
+"""
+
+from timer_wheel import TimerWheel
+
+
+def create_wheel():
+    """Returns a small wheel with one second ticks, so timers cascade through every level quickly
+
+    Level 0 holds delays under 4 ticks, level 1 under 16, level 2 under 64, & longer delays are rescheduled
+    """
+    return TimerWheel(resolution=1, slots=4, levels=3)
+
+
+def advance_until_empty(wheel, limit=200):
+    """Advances 'wheel' one tick at a time, returning the tick on which each key expired"""
+    expiries = {}
+
+    for tick in range(1, limit + 1):
+        for key in wheel.advance(1):
+            expiries[key] = tick
+
+        if not wheel:
+            break
+
+    return expiries
+
+
+def test_timers_expire_on_time_at_every_level():
+    wheel = create_wheel()
+    delays = range(1, 100)
+
+    for delay in delays:
+        wheel.schedule(delay, delay)
+
+    assert advance_until_empty(wheel) == {delay: delay for delay in delays}
+
+
+def test_timers_scheduled_mid_rotation_expire_on_time():
+    wheel = create_wheel()
+    wheel.advance(7)
+    delays = range(1, 100)
+
+    for delay in delays:
+        wheel.schedule(delay, delay)
+
+    assert advance_until_empty(wheel) == {delay: delay for delay in delays}
+
+
+def test_timers_expire_in_order():
+    wheel = create_wheel()
+
+    for key, delay in (("late", 40), ("soon", 2), ("later", 70), ("middle", 9)):
+        wheel.schedule(key, delay)
+
+    assert wheel.advance(100) == ["soon", "middle", "late", "later"]
+
+
+def test_cancelled_timer_never_expires():
+    wheel = create_wheel()
+    wheel.schedule("item", 20)
+    wheel.cancel("item")
+
+    assert "item" not in wheel
+    assert wheel.advance(100) == []
+
+
+def test_rescheduled_timer_expires_once_at_new_delay():
+    wheel = create_wheel()
+    wheel.schedule("item", 5)
+    wheel.schedule("item", 30)
+
+    assert wheel.get_remaining("item") == 30
+    assert advance_until_empty(wheel) == {"item": 30}
@@ -0,0 +1,131 @@
+"""
+A hierarchical timer wheel, for tracking large numbers of timers that rarely need to be checked individually
+"""
+
+__author__ = "agent"
+__version__ = "1.1.0"
+__date__ = "18/10/2026"
+
+import math
+
+
+class TimerWheel:
+    """Schedules keys to expire after a delay, with constant time scheduling, cancelling & expiry
+
+    Time is divided into ticks of a fixed resolution. Each level of the wheel is a ring of slots;
+    a slot of the first level holds the timers that expire on one tick, and a slot of each higher
+    level holds the timers that expire within a whole rotation of the level below it. When a level
+    completes a rotation, the next slot of the level above is cascaded down into it.
+
+    Timers expire on the first tick at or after their delay, so are accurate to within the resolution.
+    """
+
+    def __init__(self, resolution=.1, slots=64, levels=3):
+        """Constructor
+
+        Parameters:
+            resolution (float): The length of each tick, in seconds
+            slots (int): The number of slots in each level of the wheel
+            levels (int): The number of levels; delays longer than
+                          resolution * slots ** levels are rescheduled until they expire
+        """
+        self._resolution = resolution
+        self._slots = slots
+
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        # key -> (level, slot, tick on which it expires)
+        self._timers = {}
+
+        self._tick = 0
+        self._time = 0
+
+    def _insert(self, key, expiry):
+        """Places 'key' in the slot of the lowest level that spans its 'expiry' tick"""
+        delta = expiry - self._tick
+        level = 0
+        unit = 1
+
+        while level < len(self._wheels) - 1 and delta >= unit * self._slots:
+            level += 1
+            unit *= self._slots
+
+        # delays beyond the top level wait in its furthest slot, then are reinserted when it cascades
+        slot = min(expiry // unit, self._tick // unit + self._slots) % self._slots
+
+        self._wheels[level][slot][key] = expiry
+        self._timers[key] = level, slot, expiry
+
+    def schedule(self, key, delay):
+        """Schedules 'key' to expire after 'delay' seconds, replacing any timer it already has
+
+        Parameters:
+            key (object): The (hashable) key to expire
+            delay (float): The time until 'key' expires, in seconds
+        """
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self._resolution))
+        self._insert(key, self._tick + ticks)
+
+    def cancel(self, key):
+        """Cancels the timer for 'key', if it has one"""
+        timer = self._timers.pop(key, None)
+
+        if timer is not None:
+            level, slot, _ = timer
+            del self._wheels[level][slot][key]
+
+    def _cascade(self, level):
+        """Moves the timers of the current slot of 'level' into lower levels, cascading the levels above first if
+        this level has completed a rotation"""
+        unit = self._slots ** level
+        slot = (self._tick // unit) % self._slots
+
+        if slot == 0 and level + 1 < len(self._wheels):
+            self._cascade(level + 1)
+
+        timers = self._wheels[level][slot]
+        self._wheels[level][slot] = {}
+
+        for key, expiry in timers.items():
+            self._insert(key, expiry)
+
+    def advance(self, time_delta):
+        """Advances time by 'time_delta' seconds
+
+        Return:
+            list<object>: The keys whose timers have expired, in order of expiry
+        """
+        self._time += time_delta
+        target = int(self._time / self._resolution)
+        expired = []
+
+        while self._tick < target:
+            self._tick += 1
+            slot = self._tick % self._slots
+
+            if slot == 0 and len(self._wheels) > 1:
+                self._cascade(1)
+
+            timers = self._wheels[0][slot]
+
+            if timers:
+                self._wheels[0][slot] = {}
+
+                for key in timers:
+                    del self._timers[key]
+                    expired.append(key)
+
+        return expired
+
+    def get_remaining(self, key):
+        """(float) Returns the time until 'key' expires, in seconds, or None if it has no timer"""
+        timer = self._timers.get(key)
+
+        if timer is not None:
+            return max(0, timer[2] * self._resolution - self._time)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def __len__(self):
+        return len(self._timers)
@@ -7,8 +7,10 @@ __version__ = "1.1.0"
 __date__ = "26/04/2019"
 __copyright__ = "The University of Queensland, 2019"
 
+import math
 import pymunk
 import time
+from collections import namedtuple, OrderedDict
 from typing import Tuple, Iterable
 
 from physical_thing import BoundaryWall, PhysicalThing
@@ -16,6 +18,12 @@ from player import Player
 from dropped_item import DroppedItem
 from block import Block
 from mob import Mob
+from spatial_hash import SpatialHash
+from timer_wheel import TimerWheel
+from mob_scheduler import MobScheduler, MOB_THINK_BUDGET, MOB_THINK_WINDOWS
+from pathfinding import PathFinder
+from body_pool import BodyPool
+from broadphase import BROADPHASES, calibrate_broadphase, use_spatial_hash
 
 # The intention with the following constants is to express a finite range of values that
 # can effectively be treated as their own type in this code. We have used collections of
@@ -44,9 +52,68 @@ PHYSICAL_THING_CATEGORIES = {
     "mob": 2 ** 5
 }
 
+# Pairs of categories of physical thing that pass through each other, rather than colliding
+#   - Applied as collision masks (see pymunk.ShapeFilter), so these pairs are rejected by the
+#     broadphase, before any contact is generated
+#   - Dropped items piling up would otherwise generate many contacts between themselves every step
+NON_COLLIDING_CATEGORIES = {
+    ("item", "item"),
+}
+
+# Bodies moving slower than the idle speed for the sleep time (in seconds) are put to sleep, and are
+# neither simulated nor stepped until something wakes them (a collision, change in velocity, etc.)
+IDLE_SPEED_THRESHOLD = 5
+SLEEP_TIME_THRESHOLD = .5
+
+# The cell size of the spatial hash used to find things near each other (see get_neighbours),
+# as a multiple of the cell expanse
+NEIGHBOUR_CELL_SCALE = 2
+
+# How often (in seconds) nearby dropped items of the same type are merged, and how near they must be
+ITEM_MERGE_INTERVAL = .5
+ITEM_MERGE_DISTANCE = 16
+
+# How long (in seconds) dropped items last before despawning, and the most that can be in the world
+# at once; beyond that, the oldest items are despawned first
+ITEM_LIFETIME = 300
+MAX_DROPPED_ITEMS = 1000
+
+# Mobs further than the radius from the player lose their physics body and move kinematically, until they
+# come back within the radius; whether each mob is in range is checked every interval (in seconds)
+MOB_LOD_RADIUS = 640
+MOB_LOD_INTERVAL = .25
+# Mobs leave full physics a little beyond the radius, so mobs near its edge don't switch every check
+MOB_LOD_HYSTERESIS = 1.2
+# The fraction of horizontal velocity dormant mobs lose per second
+DORMANT_MOB_DAMPING = .5
+
+# The bounds on the number of substeps each step is divided into, and the furthest (as a multiple of the
+# cell expanse) any body may move in one substep; fast bodies get more substeps, so they don't tunnel
+# through blocks
+MIN_SUBSTEPS = 1
+MAX_SUBSTEPS = 4
+MAX_SUBSTEP_TRAVEL = .25
+
+# The bounds on the number of iterations of the physics solver, which are increased by one for every
+# so many pairs of shapes in contact, so piles of things stay stable while quiet scenes are cheap
+MIN_SOLVER_ITERATIONS = 5
+MAX_SOLVER_ITERATIONS = 20
+CONTACTS_PER_ITERATION = 20
+# How often (in seconds) the contacts are counted to choose the number of iterations
+SOLVER_ADAPT_INTERVAL = .25
+
 # Names for each collision event recognised by pymunk (can have a callback attached)
 COLLISION_HANDLER_CALLBACKS = {'begin', 'separate', 'pre_solve', 'post_solve'}
 
+# The result of a raycast that hit a block
+#   - block: The first block hit
+#   - cell: The (column, row) position of the block's cell
+#   - face: The (x, y) outward normal of the block's face that was hit, i.e. (-1, 0) for its left face,
+#           or None if the ray started inside the block
+#   - point: The (x, y) position at which the ray hit the block
+#   - distance: The distance along the ray from its start to point
+RaycastHit = namedtuple('RaycastHit', ['block', 'cell', 'face', 'point', 'distance'])
+
 
 class World:
     """Game world that contains things in physical space.
@@ -66,7 +133,12 @@ class World:
     """
 
     def __init__(self, grid_size, cell_expanse, gravity=(0, 300), boundary_thickness=50,
-                 collision_types=None, thing_categories=None):
+                 collision_types=None, thing_categories=None, idle_speed_threshold=IDLE_SPEED_THRESHOLD,
+                 sleep_time_threshold=SLEEP_TIME_THRESHOLD, item_merge_interval=ITEM_MERGE_INTERVAL,
+                 item_lifetime=ITEM_LIFETIME, max_items=MAX_DROPPED_ITEMS, mob_think_budget=MOB_THINK_BUDGET,
+                 mob_think_windows=MOB_THINK_WINDOWS, mob_lod_radius=MOB_LOD_RADIUS, non_colliding_categories=None,
+                 broadphase="auto", substep_bounds=(MIN_SUBSTEPS, MAX_SUBSTEPS),
+                 iteration_bounds=(MIN_SOLVER_ITERATIONS, MAX_SOLVER_ITERATIONS)):
         """Creates a new world with four boundary walls
 
         Parameters:
@@ -80,6 +152,24 @@ class World:
             thing_categories (dict<str: int>):
                     Mapping of thing categories to unique powers of 2
                     Defaults to PHYSZICAL_THING_CATEGORIES constant
+            idle_speed_threshold (float): The speed below which a body is considered idle
+            sleep_time_threshold (float): The time (in seconds) a body must be idle before sleeping
+            item_merge_interval (float): The time (in seconds) between merging nearby dropped items
+                                         (see merge_items), or None to never merge them
+            item_lifetime (float): The time (in seconds) before dropped items despawn, or None to never despawn
+            max_items (int): The maximum number of dropped items, or None for no maximum
+            mob_think_budget (int): The most mobs that think per step (see MobScheduler), or None for no limit
+            mob_think_windows (int): The number of think windows per think interval, in which the due mobs
+                                     think together (see MobScheduler), or None for mobs to think when due
+            mob_lod_radius (float): The distance from the player beyond which mobs go dormant (see update_mob_lod),
+                                    or None to always simulate mobs fully
+            non_colliding_categories (set<tuple<str, str>>):
+                    Pairs of thing categories that don't collide with each other
+                    Defaults to NON_COLLIDING_CATEGORIES constant
+            broadphase (str): The broadphase of the physics space, in BROADPHASES, or 'auto' to use
+                              whichever is faster in a quick benchmark (see calibrate_broadphase)
+            substep_bounds (tuple<int, int>): The (minimum, maximum) number of substeps per step (see step)
+            iteration_bounds (tuple<int, int>): The (minimum, maximum) number of iterations of the physics solver
 
         """
         if collision_types is None:
@@ -90,15 +180,96 @@ class World:
             thing_categories = PHYSICAL_THING_CATEGORIES
         self._thing_categories = thing_categories
 
+        if non_colliding_categories is None:
+            non_colliding_categories = NON_COLLIDING_CATEGORIES
+
+        # category name -> the collision mask of things in that category
+        self._collision_masks = {}
+        for category in thing_categories:
+            mask = pymunk.ShapeFilter.ALL_MASKS
+
+            for category_a, category_b in non_colliding_categories:
+                if category == category_a:
+                    mask &= ~thing_categories[category_b]
+                elif category == category_b:
+                    mask &= ~thing_categories[category_a]
+
+            self._collision_masks[category] = mask
+
         self._space = pymunk.Space()
 
+        # the time each broadphase took in the calibration benchmark, if it was run
+        self._broadphase_timings = None
+        if broadphase == "auto":
+            self._broadphase_timings = calibrate_broadphase(grid_size, cell_expanse)
+            broadphase = min(self._broadphase_timings, key=self._broadphase_timings.get)
+        elif broadphase not in BROADPHASES:
+            raise KeyError(f"Unknown broadphase {broadphase}")
+
+        self._broadphase = broadphase
+        if broadphase == "hash":
+            use_spatial_hash(self._space, grid_size, cell_expanse)
+
         self._space.gravity = gravity
+        self._space.idle_speed_threshold = idle_speed_threshold
+        self._space.sleep_time_threshold = sleep_time_threshold
 
         self._grid_size = grid_size
         self._cell_expanse = cell_expanse
 
         self._pixel_size = tuple(grid * cell_expanse for grid in grid_size)
 
+        # (column, row) position -> block in that cell
+        self._blocks = {}
+        # callbacks for when a block is added or removed (see add_block_listener)
+        self._block_listeners = []
+        # blocks enclosed on every side by other blocks, whose shapes are left out of the space
+        # since nothing can touch them (see add_block_to_grid)
+        self._buried_blocks = {}
+
+        self._pathfinder = PathFinder(lambda column, row: (column, row) in self._blocks, grid_size)
+        self.add_block_listener(self._pathfinder.invalidate)
+        # Things with dynamic bodies, which are stepped while awake (see step)
+        self._dynamic_things = {}
+        # bodies & shapes of things added by add_thing are recycled; removed bodies are released after the
+        # physics step, since they may have been removed from within it (i.e. by a collision callback)
+        self._body_pool = BodyPool()
+        self._pending_release = []
+        # The positions of dynamic things, updated each step while they are awake
+        self._neighbours = SpatialHash(cell_expanse * NEIGHBOUR_CELL_SCALE)
+
+        self._item_merge_interval = item_merge_interval
+        self._time_since_merge = 0
+
+        self._item_lifetime = item_lifetime
+        self._max_items = max_items
+        self._item_timers = TimerWheel()
+        # dropped items, from oldest to newest
+        self._items = OrderedDict()
+        self._despawn_counts = {'expired': 0, 'evicted': 0}
+
+        self._mob_scheduler = MobScheduler(mob_think_budget, mob_think_windows)
+        # systems updated every step (see add_system)
+        self._systems = []
+        self._mobs = {}
+
+        # mobs whose bodies have been removed from the space, since they are far from the player
+        self._dormant_mobs = {}
+        self._mob_lod_radius = mob_lod_radius
+        self._time_since_lod = 0
+        # mobs near the player think first
+        self._player = None
+
+        self._substep_bounds = substep_bounds
+        self._iteration_bounds = iteration_bounds
+        self._time_since_adapt = SOLVER_ADAPT_INTERVAL
+        self._substeps = substep_bounds[0]
+
+        # statistics about the last step (see get_physics_stats)
+        self._physics_stats = {}
+        # '<collision type>-<collision type>' -> the number of collision callbacks run in the last step
+        self._handler_counts = {}
+
         self._create_boundaries(boundary_thickness)
 
         self._last_time = time.time()
@@ -121,11 +292,114 @@ class World:
 
             shape.friction = 1.
             shape.collision_type = self._collision_types['wall']
-            shape.filter = pymunk.ShapeFilter(categories=self._thing_categories["wall"])
+            shape.filter = self._get_shape_filter(self._thing_categories["wall"])
             shape.object = wall
 
             self._space.add(shape)
 
+    def _get_shape_filter(self, categories):
+        """(pymunk.ShapeFilter) Returns the filter for a shape in 'categories', masking out the
+        categories it doesn't collide with (see NON_COLLIDING_CATEGORIES)"""
+        mask = pymunk.ShapeFilter.ALL_MASKS
+
+        for category, category_mask in self._collision_masks.items():
+            if categories & self._thing_categories[category]:
+                mask &= category_mask
+
+        return pymunk.ShapeFilter(categories=categories, mask=mask)
+
+    def collides(self, category_a: str, category_b: str) -> bool:
+        """(bool) Returns True iff things in the two categories collide with each other"""
+        return bool(self._collision_masks[category_a] & self._thing_categories[category_b])
+
+    def get_contact_pair_counts(self):
+        """Returns the number of pairs of things in contact, by the categories of the pair
+
+        Counts the pairs that passed the broadphase & collision filtering on the last step, i.e.
+        whose shapes' bounding boxes overlapped, from the arbiters of all awake bodies
+
+        Return:
+            dict<str: int>: The number of pairs for each pair of categories, named 'category-category'
+                            (i.e. 'item-mob'), in alphabetical order
+        """
+        names = {mask: category for category, mask in self._thing_categories.items()}
+
+        counts = {}
+        for shapes in self._get_arbiter_contacts():
+            name = '-'.join(sorted(names.get(shape.filter.categories, 'other') for shape in shapes))
+            counts[name] = counts.get(name, 0) + 1
+
+        return counts
+
+    def _get_arbiter_contacts(self):
+        """Returns the arbiters of all awake bodies from the last step, each counted once
+
+        Return:
+            dict<tuple<pymunk.Shape, pymunk.Shape>: int>: The number of contact points between each pair of shapes
+        """
+        contacts = {}
+
+        def add_arbiter(arbiter):
+            contacts[tuple(sorted(arbiter.shapes, key=id))] = len(arbiter.contact_point_set.points)
+
+        for thing in self._dynamic_things:
+            body = thing.get_shape().body
+
+            if thing not in self._dormant_mobs and not body.is_sleeping:
+                body.each_arbiter(add_arbiter)
+
+        return contacts
+
+    def get_last_step_time(self):
+        """(float) Returns the time (in seconds) the physics space took on the last step, or None before the
+        first step; unlike get_physics_stats, this costs nothing to call every step"""
+        return self._physics_stats.get('step_time')
+
+    def get_body_pool_stats(self):
+        """(dict) Returns statistics about the reuse of bodies (see BodyPool.get_stats)"""
+        return self._body_pool.get_stats()
+
+    def get_physics_stats(self):
+        """Returns statistics about the physics simulation on the last step
+
+        Arbiters & static shapes are counted when this is called, so it costs more than most getters
+
+        Return:
+            dict: Containing:
+                - 'broadphase': The broadphase of the physics space (see get_broadphase)
+                - 'time_delta': The time (in seconds) simulated by the last step
+                - 'step_time': The time (in seconds) the physics space took to step
+                - 'substeps': The number of substeps the step was divided into (see get_substeps)
+                - 'iterations': The number of iterations of the physics solver (see get_solver_iterations)
+                - 'max_speed': The speed of the fastest awake body
+                - 'active_bodies', 'sleeping_bodies': The number of dynamic bodies awake & asleep
+                - 'static_shapes': The number of static shapes (walls & exposed blocks) in the space
+                - 'arbiters': The number of pairs of shapes in contact
+                - 'contacts': The number of contact points between those pairs
+                - 'handler_calls': The number of collision callbacks run for each pair of collision types
+                                   (see add_collision_handler), named '<type a>-<type b>'
+        """
+        contacts = self._get_arbiter_contacts()
+        static_body = self._space.static_body
+        static_shapes = sum(1 for shape in self._space.shapes if shape.body is static_body)
+
+        return dict(self._physics_stats,
+                    broadphase=self._broadphase,
+                    static_shapes=static_shapes,
+                    arbiters=len(contacts),
+                    contacts=sum(contacts.values()),
+                    handler_calls=dict(self._handler_counts))
+
+    def get_broadphase(self):
+        """Returns the broadphase of the physics space, & how it was chosen
+
+        Return:
+            tuple<str, dict<str: float>>: The broadphase (in BROADPHASES), & the time (in seconds) each
+                                          broadphase took in the calibration benchmark, or None if it wasn't run
+        """
+        timings = dict(self._broadphase_timings) if self._broadphase_timings is not None else None
+        return self._broadphase, timings
+
     def set_gravity(self, gravity_x, gravity_y):
         """Sets the gravity of the world
 
@@ -135,6 +409,11 @@ class World:
         """
         self._space.gravity = (gravity_x, gravity_y)
 
+    def get_gravity(self):
+        """(tuple<float, float>) Returns the (x, y) gravity of the world"""
+        gravity = self._space.gravity
+        return gravity.x, gravity.y
+
     def get_pixel_size(self):
         """Returns the (width, height) size of the world"""
         return self._pixel_size
@@ -150,26 +429,131 @@ class World:
     def step(self, game_data):
         """Steps the game world forward by one time step
 
-        1. Advances all things in the game world forward by one time step
-            step method is called on each thing, with:
+        1. Periodically switches mobs between full physics & dormancy, depending on their distance
+           from the player, and moves dormant mobs (see update_mob_lod)
+        2. Advances all dynamic things in the game world forward by one time step
+            step method is called on each thing that is awake & overrides it (see PhysicalThing.step), with:
                 - time_delta: the time (in seconds) since the last step
                 - game_data: the game_data parameter supplied to this method
-        2. Applies/resolves physics
+           and the positions of awake things are updated for neighbour queries (see get_neighbours)
+        3. Answers pending path requests, within the path finding budget (see PathFinder.update)
+           & lets the mobs that are due think (see MobScheduler.update), prioritising those near the player
+           & updates each system (see add_system)
+        4. Merges nearby dropped items, periodically (see merge_items)
+        5. Despawns dropped items that have outlived their lifetime
+        6. Applies/resolves physics, timing it (see get_physics_stats), in substeps (see get_substeps)
 
         Parameters:
             game_data (app.GameData): Arbitrary data to be passed on to all things
         """
         now = time.time()
         time_delta = now - self._last_time
-        for shape in self._space.shapes:
-            thing = shape.object
 
-            if thing:
+        self._time_since_lod += time_delta
+        if self._time_since_lod >= MOB_LOD_INTERVAL:
+            self.update_mob_lod(self._time_since_lod)
+            self._time_since_lod = 0
+
+        neighbours = self._neighbours
+        dormant_mobs = self._dormant_mobs
+        sleeping = 0
+        max_speed = 0
+
+        for thing in list(self._dynamic_things):
+            body = thing.get_shape().body
+
+            # sleeping things haven't moved, & only wake when something else moves them
+            if body.is_sleeping:
+                sleeping += 1
+                continue
+
+            position = body.position
+            neighbours.add(thing, position.x, position.y)
+
+            if thing not in dormant_mobs:
+                max_speed = max(max_speed, body.velocity.length)
+
+            # none of the game's things act every step (mobs think instead, see MobScheduler), so the
+            # default, empty step isn't called; it remains the hook for things that do
+            if type(thing).step is not PhysicalThing.step:
                 thing.step(time_delta, game_data)
 
-        self._space.step(time_delta)
+        self._pathfinder.update(time_delta)
+
+        focus = self._player.get_position() if self._player else None
+        self._mob_scheduler.update(time_delta, game_data, focus)
+
+        for system in self._systems:
+            system.update(self, time_delta, game_data)
+
+        if self._item_merge_interval is not None:
+            self._time_since_merge += time_delta
+
+            if self._time_since_merge >= self._item_merge_interval:
+                self._time_since_merge = 0
+                self.merge_items()
+
+        for item in self._item_timers.advance(time_delta):
+            self.remove_item(item)
+            self._despawn_counts['expired'] += 1
+
+        self._time_since_adapt += time_delta
+        if self._time_since_adapt >= SOLVER_ADAPT_INTERVAL:
+            self._time_since_adapt = 0
+            self._space.iterations = self.get_solver_iterations()
+
+        substeps = self.get_substeps(time_delta, max_speed)
+
+        self._handler_counts = {}
+        start = time.perf_counter()
+        for _ in range(substeps):
+            self._space.step(time_delta / substeps)
+        step_time = time.perf_counter() - start
+
+        for body, shape in self._pending_release:
+            self._body_pool.release(body, shape)
+        self._pending_release = []
+
+        self._physics_stats = {
+            'time_delta': time_delta,
+            'step_time': step_time,
+            'substeps': substeps,
+            'iterations': self._space.iterations,
+            'max_speed': max_speed,
+            'active_bodies': len(self._dynamic_things) - len(self._dormant_mobs) - sleeping,
+            'sleeping_bodies': sleeping,
+        }
+
         self._last_time = now
 
+    def get_substeps(self, time_delta, max_speed):
+        """Returns the number of substeps to divide a step into, so the fastest body moves no further than
+        MAX_SUBSTEP_TRAVEL cells per substep, within the substep bounds
+
+        Parameters:
+            time_delta (float): The time (in seconds) the step simulates
+            max_speed (float): The speed of the fastest awake body
+
+        Return:
+            int: The number of substeps
+        """
+        low, high = self._substep_bounds
+        travel = max_speed * time_delta / (self._cell_expanse * MAX_SUBSTEP_TRAVEL)
+
+        return max(low, min(math.ceil(travel), high))
+
+    def get_solver_iterations(self):
+        """Returns the number of iterations the physics solver should run, from the number of pairs of shapes
+        in contact (see CONTACTS_PER_ITERATION), within the iteration bounds
+
+        Return:
+            int: The number of iterations
+        """
+        low, high = self._iteration_bounds
+        arbiters = len(self._get_arbiter_contacts())
+
+        return max(low, min(low + arbiters // CONTACTS_PER_ITERATION, high))
+
     def xy_to_grid(self, x: float, y: float) -> Tuple[int, int]:
         """Converts pixel position (xy) to grid position"""
         return int(x // self._cell_expanse), int(y // self._cell_expanse)
@@ -182,10 +566,11 @@ class World:
         """Converts grid position to pixel position of its centre"""
         return int((x + .5) * self._cell_expanse), int((y + .5) * self._cell_expanse)
 
-    def _wrap_callback(self, callback):
-        """Wraps a pymunk collision callback into a more OOP form"""
+    def _wrap_callback(self, callback, pair):
+        """Wraps a pymunk collision callback into a more OOP form, counting its invocations under 'pair'"""
 
         def wrapped_callback(arbiter, space, data):
+            self._handler_counts[pair] = self._handler_counts.get(pair, 0) + 1
             thing_a, thing_b = [s.object for s in arbiter.shapes]
             return callback(thing_a, thing_b, data['data'], arbiter)
 
@@ -208,7 +593,7 @@ class World:
         for key in COLLISION_HANDLER_CALLBACKS:
             callback = local_variables[f"on_{key}"]
             if callback:
-                setattr(handler, key, self._wrap_callback(callback))
+                setattr(handler, key, self._wrap_callback(callback, f"{collision_type_a}-{collision_type_b}"))
 
     def get_all_things(self) -> Iterable[PhysicalThing]:
         """Yields all physical things in this world, including boundary walls
@@ -222,6 +607,9 @@ class World:
             if thing:
                 yield thing
 
+        yield from self._dormant_mobs
+        yield from self._buried_blocks
+
     def add_thing(self, thing: PhysicalThing, x: float, y: float, size: Tuple[float, float], collision_type=None,
                   categories=None, mass: float = 1, friction: float = 1):
         """Adds a thing to the game world centred at the position ('x', 'y')
@@ -237,32 +625,85 @@ class World:
             mass (float): The mass of the thing
             friction (float): The friction of the thing
         """
-        width, height = size
-
-        left = -width // 2
-        right = left + width
-        top = -height // 2
-        bottom = top + height
-
-        body = pymunk.Body(mass, pymunk.inf)
-        body.position = x, y
-        shape = pymunk.Poly(body, [(left, top), (left, bottom), (right, bottom), (right, top)])
+        body, shape = self._body_pool.acquire(tuple(size), mass, x, y)
 
         shape.object = thing
         if collision_type is not None:
             shape.collision_type = collision_type
 
         if categories is not None:
-            shape.filter = pymunk.ShapeFilter(categories=categories)
+            shape.filter = self._get_shape_filter(categories)
 
         shape.friction = friction
 
         thing.set_shape(shape)
         self._space.add(body, shape)
+        self._dynamic_things[thing] = None
+        self._neighbours.add(thing, x, y)
 
     def remove_thing(self, thing: PhysicalThing):
-        """Removes a thing from the world"""
-        self._space.remove(thing.get_shape())
+        """Removes a thing from the world
+
+        The bodies of things added by add_thing are kept for reuse by things of the same size"""
+        shape = thing.get_shape()
+        dynamic = thing in self._dynamic_things
+
+        if thing in self._dormant_mobs:
+            del self._dormant_mobs[thing]
+        elif thing in self._buried_blocks:
+            del self._buried_blocks[thing]
+        elif dynamic:
+            self._space.remove(shape.body, shape)
+        else:
+            self._space.remove(shape)
+
+        if dynamic:
+            del self._dynamic_things[thing]
+            self._pending_release.append((shape.body, shape))
+
+        self._neighbours.remove(thing)
+
+        if isinstance(thing, DroppedItem):
+            self._items.pop(thing, None)
+            self._item_timers.cancel(thing)
+
+        elif isinstance(thing, Mob):
+            self._mob_scheduler.remove(thing)
+            self._mobs.pop(thing, None)
+            self._pathfinder.forget(thing)
+
+        elif thing is self._player:
+            self._player = None
+
+        elif isinstance(thing, Block):
+            cell = self.xy_to_grid(*thing.get_position())
+            if self._blocks.get(cell) is thing:
+                del self._blocks[cell]
+
+                # the neighbours of the removed block are now exposed
+                for neighbour in self._get_neighbour_cells(*cell):
+                    block = self._blocks.get(neighbour)
+
+                    if block in self._buried_blocks:
+                        del self._buried_blocks[block]
+                        self._space.add(block.get_shape())
+
+                self.wake_area(*self.grid_to_xy_centre(*cell), self._cell_expanse)
+                self._notify_block_change(cell)
+
+    def wake_area(self, x: float, y: float, distance: float):
+        """Wakes all sleeping things within 'distance' of the point ('x', 'y')
+
+        Used when the terrain changes, since a block appearing or disappearing beside a
+        sleeping thing doesn't wake it by itself
+        """
+        bb = pymunk.BB(x - distance, y - distance, x + distance, y + distance)
+
+        for shape in self._space.bb_query(bb, pymunk.ShapeFilter()):
+            body = shape.body
+
+            if body.body_type == pymunk.Body.DYNAMIC and body.is_sleeping:
+                body.activate()
 
     def add_player(self, player: Player, x: float, y: float, mass: float = 50, friction: float = .5):
         """Adds a player to game world at the position ('x', 'y')"""
@@ -275,19 +716,26 @@ class World:
         shape.friction = friction
         shape.collision_type = self._collision_types['player']
         shape.object = player
-        shape.filter = pymunk.ShapeFilter(categories=self._thing_categories["player"])
+        shape.filter = self._get_shape_filter(self._thing_categories["player"])
 
         player.set_shape(shape)
 
         self._space.add(body, shape)
+        self._dynamic_things[player] = None
+        self._neighbours.add(player, x, y)
+        self._player = player
 
     def remove_player(self, player: Player):
         """Removes the player from the game world"""
-        self._space.remove(player.get_shape())
+        self.remove_thing(player)
 
     def add_block_to_grid(self, block: Block, column: int, row: int, friction: float = 1.):
         """Adds a block to the game world at the grid cell centred at ('column', 'row')
 
+        Only blocks with at least one empty neighbouring cell have their shape in the physics space,
+        since no other thing can touch a buried block. Neighbours that this block buries are taken
+        out of the space, & put back when one of their neighbours is removed (see remove_thing).
+
         Parameters:
             block (Block): The block to add to the grid
             column (int): The column of the grid cell at which to place the block
@@ -306,10 +754,70 @@ class World:
 
         shape.friction = friction
         shape.collision_type = self._collision_types['block']
-        shape.filter = pymunk.ShapeFilter(categories=self._thing_categories["block"])
+        shape.filter = self._get_shape_filter(self._thing_categories["block"])
+
+        # buried blocks' shapes aren't added to the space, which would otherwise cache their bounding box
+        shape.cache_bb()
 
         block.set_shape(shape)
-        self._space.add(shape)
+        self._blocks[column, row] = block
+
+        if self._is_buried(column, row):
+            self._buried_blocks[block] = None
+        else:
+            self._space.add(shape)
+
+        for neighbour in self._get_neighbour_cells(column, row):
+            other = self._blocks.get(neighbour)
+
+            if other is not None and other not in self._buried_blocks and self._is_buried(*neighbour):
+                self._space.remove(other.get_shape())
+                self._buried_blocks[other] = None
+
+        self.wake_area(*self.grid_to_xy_centre(column, row), self._cell_expanse)
+        self._notify_block_change((column, row))
+
+    def _get_neighbour_cells(self, column, row):
+        """(list<tuple<int, int>>) Returns the cells beside, above & below the cell at ('column', 'row')"""
+        return [(column - 1, row), (column + 1, row), (column, row - 1), (column, row + 1)]
+
+    def _is_buried(self, column, row):
+        """(bool) Returns True iff every neighbour of the cell contains a block or lies outside the grid"""
+        columns, rows = self._grid_size
+
+        return all((neighbour in self._blocks or not (0 <= neighbour[0] < columns and 0 <= neighbour[1] < rows))
+                   for neighbour in self._get_neighbour_cells(column, row))
+
+    def get_collider_counts(self):
+        """Returns the number of blocks with & without shapes in the physics space
+
+        Return:
+            dict<str: int>: The number of 'exposed' blocks, which collide, & 'buried' blocks, which don't
+        """
+        return {
+            'exposed': len(self._blocks) - len(self._buried_blocks),
+            'buried': len(self._buried_blocks),
+        }
+
+    def add_system(self, system):
+        """Adds a system, which is updated every step, after things have been stepped & mobs have thought
+
+        Parameters:
+            system (object): Has an update method taking (world, time_delta, game_data) (i.e. MobSpawner)
+        """
+        self._systems.append(system)
+
+    def add_block_listener(self, callback):
+        """Adds a callback for whenever a block is added to or removed from the grid
+
+        Parameters:
+            callback (callable): Called with the (column, row) position of the cell that changed
+        """
+        self._block_listeners.append(callback)
+
+    def _notify_block_change(self, cell):
+        for callback in self._block_listeners:
+            callback(cell)
 
     def add_block(self, block: Block, x: float, y: float, *args, **kwargs):
         """Adds a block to the game world at the grid cell that contains ('x', 'y')
@@ -324,20 +832,97 @@ class World:
         return self.add_block_to_grid(block, *self.xy_to_grid(x, y), *args, **kwargs)
 
     def get_block(self, x, y):
-        """(Block) Returns a block on the point ('x', 'y'), or None if there is no block there
+        """(Block) Returns a block on the point ('x', 'y'), or None if there is no block there"""
+        return self._blocks.get(self.xy_to_grid(x, y))
 
-        Note: It is technically possible for multiple blocks to overlap, in which case
-              this method will return one of those. This should never happen, though.
-        """
-        blocks = self._space.point_query((x, y), 0, pymunk.ShapeFilter(mask=self._thing_categories["block"]))
-
-        if blocks:
-            return blocks[0].shape.object
+    def get_block_at_cell(self, column, row):
+        """(Block) Returns the block in the grid cell at ('column', 'row'), or None if the cell is empty"""
+        return self._blocks.get((column, row))
 
     def remove_block(self, block: Block):
         """Removes a block from the game world"""
         self.remove_thing(block)
 
+    def raycast(self, start, end):
+        """Casts a ray from 'start' to 'end', returning the first block it hits
+
+        Walks the grid cells crossed by the ray in order (a grid DDA traversal), checking
+        each against the block index, so the cost is proportional to the number of cells crossed.
+
+        Parameters:
+            start (tuple<float, float>): The (x, y) position the ray starts at
+            end (tuple<float, float>): The (x, y) position the ray ends at
+
+        Return:
+            RaycastHit: The first block hit, or None if the ray reaches 'end' without hitting a block
+        """
+        x0, y0 = start
+        dx, dy = end[0] - x0, end[1] - y0
+        expanse = self._cell_expanse
+
+        column, row = self.xy_to_grid(x0, y0)
+        end_cell = self.xy_to_grid(*end)
+
+        # t is the fraction of the ray travelled; t_max_* is the value of t at the next
+        # column/row boundary, and t_delta_* is the change in t between boundaries
+        if dx:
+            step_x = 1 if dx > 0 else -1
+            t_max_x = ((column + (dx > 0)) * expanse - x0) / dx
+            t_delta_x = expanse / abs(dx)
+        else:
+            step_x, t_max_x, t_delta_x = 0, math.inf, math.inf
+
+        if dy:
+            step_y = 1 if dy > 0 else -1
+            t_max_y = ((row + (dy > 0)) * expanse - y0) / dy
+            t_delta_y = expanse / abs(dy)
+        else:
+            step_y, t_max_y, t_delta_y = 0, math.inf, math.inf
+
+        t = 0
+        face = None
+        blocks = self._blocks
+
+        while True:
+            block = blocks.get((column, row))
+
+            if block is not None:
+                return RaycastHit(block, (column, row), face, (x0 + t * dx, y0 + t * dy),
+                                  t * math.hypot(dx, dy))
+
+            if (column, row) == end_cell:
+                return None
+
+            if t_max_x < t_max_y:
+                t = t_max_x
+                t_max_x += t_delta_x
+                column += step_x
+                face = -step_x, 0
+            else:
+                t = t_max_y
+                t_max_y += t_delta_y
+                row += step_y
+                face = 0, -step_y
+
+            if t > 1:
+                return None
+
+    def raycast_many(self, rays):
+        """Casts many rays at once (see raycast)
+
+        Parameters:
+            rays (iterable<tuple<tuple<float, float>, tuple<float, float>>>): (start, end) pairs
+
+        Return:
+            list<RaycastHit>: The hit for each ray, or None for each ray that hit nothing
+        """
+        raycast = self.raycast
+        return [raycast(start, end) for start, end in rays]
+
+    def has_line_of_sight(self, start, end):
+        """(bool) Returns True iff no block lies between 'start' & 'end'"""
+        return self.raycast(start, end) is None
+
     def add_item(self, item: DroppedItem, x: float, y: float, size: Tuple[float, float] = (8, 8),
                  mass: float = 2, friction: float = 1.):
         """Adds an item to the game world centred at the position ('x', 'y')
@@ -352,10 +937,69 @@ class World:
         self.add_thing(item, x, y, size, collision_type=self._collision_types['item'],
                        categories=self._thing_categories["item"], mass=mass, friction=friction)
 
+        self._items[item] = None
+        if self._item_lifetime is not None:
+            self._item_timers.schedule(item, self._item_lifetime)
+
+        while self._max_items is not None and len(self._items) > self._max_items:
+            oldest = next(iter(self._items))
+            self.remove_item(oldest)
+            self._despawn_counts['evicted'] += 1
+
     def remove_item(self, item: DroppedItem):
         """Removes an item from the world"""
         self.remove_thing(item)
 
+    def get_despawn_counts(self):
+        """Returns the number of dropped items that have been despawned
+
+        Return:
+            dict<str: int>: The number of items that 'expired' at the end of their lifetime, & that were
+                            'evicted' to keep the number of items within the maximum
+        """
+        return dict(self._despawn_counts)
+
+    def merge_items(self, distance: float = ITEM_MERGE_DISTANCE) -> int:
+        """Merges each dropped item into a nearby dropped item of the same type, where they fit in one stack
+
+        Parameters:
+            distance (float): The maximum distance between the centres of items that are merged
+
+        Return:
+            int: The number of items that were merged into another (& removed from the world)
+        """
+        merged = 0
+
+        for item in list(self._items):
+            if item not in self._items:
+                # already merged into another item
+                continue
+
+            for other in self.get_neighbours(*item.get_position(), distance, DroppedItem):
+                if other is not item and item.merge(other):
+                    self.remove_item(other)
+                    merged += 1
+
+        return merged
+
+    def get_neighbours(self, x: float, y: float, distance: float, thing_type=None) -> [PhysicalThing]:
+        """Returns the dynamic things (players, items & mobs) within 'distance' of the point ('x', 'y')
+
+        Positions are those at the start of the current step (see step), so finding neighbours doesn't cost
+        a physics query, & only looks at things in the cells of the spatial hash around the point
+
+        Parameters:
+            x (float): The x-coordinate of the point
+            y (float): The y-coordinate of the point
+            distance (float): The maximum distance from the point to the centre of a neighbour
+            thing_type (type): Only finds things that are instances of this type, if given
+
+        Return:
+            list<PhysicalThing>: The things within 'distance'
+        """
+        return [thing for thing, _ in self._neighbours.get_nearby(x, y, distance)
+                if thing_type is None or isinstance(thing, thing_type)]
+
     def add_mob(self, mob: Mob, x: float, y: float, mass: float = 100, friction: float = 1.):
         """Adds a mob to the game world centred at the position ('x', 'y')
 
@@ -368,6 +1012,9 @@ class World:
         self.add_thing(mob, x, y, mob.get_size(), collision_type=self._collision_types['mob'],
                        categories=self._thing_categories["mob"], mass=mass, friction=friction)
 
+        self._mob_scheduler.add(mob)
+        self._mobs[mob] = None
+
     def remove_mob(self, mob: Mob):
         """Removes a mob from the world"""
         self.remove_thing(mob)
@@ -377,7 +1024,14 @@ class World:
         queries = self._space.point_query((x, y), 0, pymunk.ShapeFilter(
             mask=pymunk.ShapeFilter.ALL_MASKS ^ self._thing_categories["wall"]))
 
-        return [q.shape.object for q in queries]
+        things = [q.shape.object for q in queries]
+
+        # buried blocks aren't in the space, so can't be found by the query
+        block = self.get_block(x, y)
+        if block in self._buried_blocks:
+            things.append(block)
+
+        return things
 
     def get_thing(self, x: float, y: float) -> PhysicalThing:
         """(PhysicalThing) Returns a thing on the point ('x', 'y'), or None if there is no thing there
@@ -395,6 +1049,101 @@ class World:
 
         return [q.shape.object for q in queries]
 
+    def update_mob_lod(self, time_delta):
+        """Switches mobs between full physics & dormancy, depending on their distance from the player
+
+        Dormant mobs have no body in the physics space, so they neither collide nor fall. Instead, they
+        keep drifting horizontally with their velocity (which they still set when thinking), losing
+        DORMANT_MOB_DAMPING of it per second. When a dormant mob comes back within range, it returns to the
+        nearest free space at or above its position.
+
+        Parameters:
+            time_delta (float): The time since the last update, in seconds
+        """
+        if self._mob_lod_radius is None or self._player is None:
+            for mob in list(self._dormant_mobs):
+                self._wake_mob(mob)
+            return
+
+        player_x, player_y = self._player.get_position()
+        promote_distance = self._mob_lod_radius ** 2
+        demote_distance = (self._mob_lod_radius * MOB_LOD_HYSTERESIS) ** 2
+
+        for mob in self._dormant_mobs:
+            self._drift_mob(mob, time_delta)
+
+        for mob in self._mobs:
+            x, y = mob.get_position()
+            distance = (x - player_x) ** 2 + (y - player_y) ** 2
+
+            if mob in self._dormant_mobs:
+                if distance <= promote_distance:
+                    self._wake_mob(mob)
+            elif distance > demote_distance:
+                self._space.remove(mob.get_shape().body, mob.get_shape())
+                self._dormant_mobs[mob] = None
+
+    def _drift_mob(self, mob, time_delta):
+        """Moves a dormant mob horizontally for 'time_delta' seconds, keeping it within the world"""
+        shape = mob.get_shape()
+        body = shape.body
+
+        velocity_x = body.velocity.x
+        x, y = body.position
+        half_width = mob.get_size()[0] / 2
+
+        x = max(half_width, min(x + velocity_x * time_delta, self._pixel_size[0] - half_width))
+
+        body.position = x, y
+        body.velocity = velocity_x * max(0, 1 - DORMANT_MOB_DAMPING * time_delta), 0
+        shape.cache_bb()
+
+    def _wake_mob(self, mob):
+        """Returns a dormant mob to full physics, moving it up out of any blocks it has drifted into"""
+        del self._dormant_mobs[mob]
+
+        shape = mob.get_shape()
+        body = shape.body
+        width, height = mob.get_size()
+        x, y = body.position
+
+        while y - height / 2 > 0 and self._overlaps_blocks(x, y, width, height):
+            y -= self._cell_expanse
+
+        body.position = x, y
+        self._space.add(body, shape)
+        shape.cache_bb()
+
+    def _overlaps_blocks(self, x, y, width, height):
+        """(bool) Returns True iff a box of size ('width', 'height') centred at ('x', 'y') overlaps a block"""
+        left, top = self.xy_to_grid(x - width / 2, y - height / 2)
+        right, bottom = self.xy_to_grid(x + width / 2, y + height / 2)
+
+        return any((column, row) in self._blocks
+                   for column in range(left, right + 1)
+                   for row in range(top, bottom + 1))
+
+    def get_all_mobs(self) -> [Mob]:
+        """(list<Mob>) Returns all mobs in this world"""
+        return list(self._mobs)
+
+    def get_pathfinder(self) -> PathFinder:
+        """(PathFinder) Returns the path finder over this world's block grid
+
+        Mobs should request paths (see PathFinder.request) so searches are spread across steps"""
+        return self._pathfinder
+
+    def get_mob_lod_counts(self):
+        """(dict<str: int>) Returns the number of mobs that are 'active' (fully simulated) & 'dormant'"""
+        return {
+            'active': len(self._mobs) - len(self._dormant_mobs),
+            'dormant': len(self._dormant_mobs),
+        }
+
+    def get_mob_scheduler_stats(self):
+        """(dict<str: int>) Returns statistics about the thinking of mobs (see MobScheduler.get_stats)"""
+        return self._mob_scheduler.get_stats()
+
     def get_mobs(self, x: float, y: float, max_distance: float) -> [Mob]:
         """(list<Mob>) Returns all mobs within 'max_distance' from the point ('x', 'y')"""
         queries = self._space.point_query((x, y), max_distance,